@@ -13,6 +13,7 @@ Each game is one session - fresh context but persistent learnings.
 
 import argparse
 import asyncio
+import atexit
 import logging
 import os
 import signal
@@ -47,12 +48,15 @@ class DCSSDriver:
         # Initialize knowledge base and analyzer
         knowledge_dir = Path(__file__).parent.parent / "knowledge"
         self.kb = KnowledgeBase(knowledge_dir)
+        # Backstop for interpreter exits that bypass run_forever's finally
+        atexit.register(self.kb.flush_meta)
         # Analyzer gets provider after provider init in run_forever()
         self.analyzer = None
         self._last_knowledge_place = None
 
-        # Set narrate interval for game.py to read
+        # Set narrate interval for the game wrapper and tools.py to read
         os.environ["DCSS_NARRATE_INTERVAL"] = str(config["narrate_interval"])
+        self.dcss.set_narrate_interval(config["narrate_interval"])
 
         logging.basicConfig(
             level=logging.DEBUG if config.get("debug") else logging.INFO,
@@ -388,6 +392,12 @@ class DCSSDriver:
 
     async def run_forever(self):
         """Main loop - runs games forever until interrupted."""
+        try:
+            await self._run_forever()
+        finally:
+            self.kb.flush_meta()
+
+    async def _run_forever(self):
         self._loop = asyncio.get_running_loop()
         self.logger.info("Starting DCSS AI Driver")
         self.logger.info(f"Config: provider={self.config['provider']}, model={self.config['model']}, analyzer_model={self.config.get('analyzer_model', 'default')}")
@@ -1,21 +1,36 @@
 """GameActions mixin: all turn-consuming actions."""
 import logging
+from functools import lru_cache
 from typing import List
 
+from .utils import _SLOT_INDEX, _pos_key
+
 logger = logging.getLogger(__name__)
 
+_DIR_KEYS = {"n": "key_dir_n", "s": "key_dir_s", "e": "key_dir_e", "w": "key_dir_w",
+             "ne": "key_dir_ne", "nw": "key_dir_nw", "se": "key_dir_se", "sw": "key_dir_sw"}
+
+_VALID_STATS = frozenset({"S", "I", "D"})
+_RESPONSE_KEYS = {"yes": "Y", "no": "N", "escape": "key_esc"}
+
+
+@lru_cache(maxsize=16)
+def _dir_key(direction: str) -> str:
+    """Map a direction name to its webtiles key, passing unknown values through."""
+    return _DIR_KEYS.get(direction.lower(), direction)
+
 
 class GameActions:
     """Mixin providing all game actions that consume turns."""
 
+    __slots__ = ()
+
     def move(self, direction: str) -> List[str]:
-        key_map = {"n": "key_dir_n", "s": "key_dir_s", "e": "key_dir_e", "w": "key_dir_w",
-                   "ne": "key_dir_ne", "nw": "key_dir_nw", "se": "key_dir_se", "sw": "key_dir_sw"}
-        d = direction.lower()
-        if d not in key_map:
+        key = _DIR_KEYS.get(direction.lower())
+        if key is None:
             return [f"Invalid direction: {direction}. Use n/s/e/w/ne/nw/se/sw"]
         turn_before = self._turn
-        result = self._act(key_map[d])
+        result = self._act(key)
         if self._turn == turn_before:
             self._consecutive_failed_moves += 1
             n = self._consecutive_failed_moves
@@ -175,8 +190,7 @@ class GameActions:
 
     def pickup(self) -> List[str]:
         # Check if there are items at current position
-        px, py = self._position
-        items_here = self._items.get((px, py), []) if hasattr(self, '_items') else []
+        items_here = self._items.get(_pos_key(*self._position)) if self._items else None
         if not items_here:
             return ["Nothing to pick up here."]
         msgs = self._act(",")
@@ -203,7 +217,7 @@ class GameActions:
             # Stage 2: aim and fire
             if direction:
                 # Send direction then Enter to confirm targeting
-                dir_key = self._dir_key(direction)
+                dir_key = _dir_key(direction)
                 self._ws.send_key(dir_key)
                 time.sleep(0.1)
                 result = self._act("key_enter")
@@ -232,11 +246,6 @@ class GameActions:
             msg_start = max(0, len(self._messages) - 5)
             return self._messages[msg_start:]
 
-    def _dir_key(self, direction: str) -> str:
-        key_map = {"n": "key_dir_n", "s": "key_dir_s", "e": "key_dir_e", "w": "key_dir_w",
-                   "ne": "key_dir_ne", "nw": "key_dir_nw", "se": "key_dir_se", "sw": "key_dir_sw"}
-        return key_map.get(direction.lower(), direction)
-
     def quaff(self, key: str) -> List[str]:
         return self._act("q", key)
 
@@ -259,7 +268,7 @@ class GameActions:
 
     def choose_stat(self, stat: str) -> List[str]:
         stat = stat.upper()
-        if stat not in ("S", "I", "D"):
+        if stat not in _VALID_STATS:
             return ["[ERROR: Invalid stat. Use 'S' (Strength), 'I' (Intelligence), or 'D' (Dexterity).]"]
         if self._pending_prompt != "stat_increase":
             return ["[No stat increase prompt pending.]"]
@@ -267,27 +276,26 @@ class GameActions:
         return self._act(stat, menu_ok=True)
 
     def respond(self, action: str) -> List[str]:
-        key_map = {"yes": "Y", "no": "N", "escape": "key_esc"}
-        key = key_map.get(action.lower(), "key_esc")
+        key = _RESPONSE_KEYS.get(action.lower(), "key_esc")
         return self._act(key, menu_ok=True)
 
     def escape(self) -> List[str]:
         return self._act("key_esc", menu_ok=True)
 
     def send_keys(self, keys: str) -> List[str]:
-        return self._act(*list(keys))
+        return self._act(*keys)
 
     def zap_wand(self, slot: str, direction: str = "") -> List[str]:
         keys = ["V", slot]
         if direction:
-            keys.append(self._dir_key(direction))
+            keys.append(_dir_key(direction))
         return self._act(*keys)
 
     def evoke(self, slot: str) -> List[str]:
         return self._act("v", slot)
 
     def throw_item(self, slot: str, direction: str) -> List[str]:
-        return self._act("F", slot, self._dir_key(direction))
+        return self._act("F", slot, _dir_key(direction))
 
     def put_on_jewelry(self, slot: str) -> List[str]:
         return self._act("P", slot)
@@ -301,11 +309,11 @@ class GameActions:
         return self._act("T", slot)
 
     def examine(self, slot: str) -> List[str]:
-        inv = self.get_inventory()
-        for item in inv:
-            if item.get("slot") == slot:
-                return [f"{slot} - {item.get('name', 'unknown')} (qty: {item.get('quantity', 1)})"]
-        return [f"No item in slot '{slot}'."]
+        data = self._inventory.get(_SLOT_INDEX.get(slot))
+        name = data.get("name", "") if data else ""
+        if not name or name == "?":
+            return [f"No item in slot '{slot}'."]
+        return [f"{slot} - {name} (qty: {data.get('quantity', 1)})"]
 
     def auto_play(self, hp_threshold: int = 50, max_actions: int = 50,
                   stop_on_items: bool = True, stop_on_altars: bool = True,
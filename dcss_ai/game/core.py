@@ -13,12 +13,30 @@ from .state import GameState
 from .actions import GameActions
 from .ui import UIHandler
 from .overlay import OverlayStats
-from .utils import _strip_formatting, _strip_html
+from .utils import _strip_formatting, _strip_html, _LANDMARKS, _grid_key
 
 logger = logging.getLogger(__name__)
 
 OVERLAY_STATS_PATH = os.environ.get("DCSS_OVERLAY_STATS", os.path.expanduser("~/code/dcss-stream/stats.json"))
 
+# Actions allowed between narrate() calls; 0 disables the check.
+# The driver overrides this per instance via set_narrate_interval().
+_NARRATE_INTERVAL = int(os.environ.get("DCSS_NARRATE_INTERVAL", "5"))
+
+# Low word mask for 64-bit tile flags sent as a [lo, hi] pair
+_FG_LO_MASK = 0xFFFFFFFF
+
+# Message types _act reacts to while waiting for input
+_UI_PUSH_MSGS = frozenset(("ui-push", "ui-state"))
+_MENU_MSGS = frozenset(("menu", "update_menu", "update_menu_items"))
+_CLOSE_MENU_MSGS = frozenset(("close_menu", "close_all_menus"))
+
+# Environmental overlay flags a map cell may carry
+_OVERLAY_KEYS = ("silenced", "sanctuary", "halo", "liquefied",
+                 "orb_glow", "quad_glow", "disjunct", "awakened_forest",
+                 "blasphemy", "highlighted_summoner")
+_OVERLAY_KEY_SET = frozenset(_OVERLAY_KEYS)
+
 
 class DCSSGame(GameState, GameActions, UIHandler, OverlayStats):
     """High-level API for controlling DCSS via webtiles WebSocket.
@@ -27,12 +45,45 @@ class DCSSGame(GameState, GameActions, UIHandler, OverlayStats):
     Properties are free (no turn cost). Actions consume turns.
     """
 
+    # Every instance attribute is declared here; the mixins declare empty
+    # __slots__ so no instance __dict__ is created.
+    __slots__ = (
+        # Connection/lifecycle
+        "_ws", "_connected", "_in_game", "_game_ids", "_username",
+        "_stats_path", "_stats_tmp_path", "_stats_dir_ready",
+        "_attempt", "_wins", "_deaths",
+        # Player stats
+        "_hp", "_max_hp", "_mp", "_max_mp", "_ac", "_ev", "_sh",
+        "_str", "_int", "_dex", "_xl", "_place", "_depth", "_god", "_gold",
+        "_position", "_turn", "_is_dead", "_actions_since_narrate", "_narrate_interval",
+        "_session_ended", "_species", "_title",
+        "_consecutive_timeouts", "_consecutive_failed_moves", "_last_auto_play_turn",
+        # Inventory, messages and map state
+        "_inventory", "_messages", "_msg_seq", "_unknown_command_seq",
+        "_map_cells", "_tile_fg", "_cell_features", "_cell_overlays",
+        "_monsters", "_monster_pos", "_monster_grid", "_monster_names", "_landmarks",
+        "_items",
+        # Menu/popup/prompt state
+        "_current_menu", "_menu_items", "_current_popup", "_pending_prompt",
+        # Status effects, piety, contamination, etc.
+        "_status_effects", "_status_text", "_poison_survival", "_real_hp_max",
+        "_piety_rank", "_penance", "_contam", "_noise", "_adjusted_noise", "_form",
+        "_quiver_desc", "_elapsed_time", "_xl_progress", "_weapon_index",
+        "_offhand_index", "_ac_mod", "_ev_mod", "_sh_mod", "_doom", "_lives",
+        # Notepad
+        "_notepad", "_notepad_total",
+        # Rendered-text caches
+        "_state_version", "_render_cache", "_stripped_text",
+    )
+
     def __init__(self, stats_path: str = OVERLAY_STATS_PATH):
         self._ws: Optional[WebTilesConnection] = None
         self._connected = False
         self._in_game = False
         self._game_ids: List[str] = []
         self._stats_path = stats_path
+        self._stats_tmp_path = stats_path + ".tmp"
+        self._stats_dir_ready = False
 
         # Persistent stats (loaded from overlay file)
         self._attempt = 0
@@ -60,23 +111,37 @@ class DCSSGame(GameState, GameActions, UIHandler, OverlayStats):
         self._turn = 0
         self._is_dead = False
         self._actions_since_narrate = 0
+        self._narrate_interval = _NARRATE_INTERVAL
         self._session_ended = False
         self._species = ""
         self._title = ""
         self._consecutive_timeouts = 0
         self._consecutive_failed_moves = 0
 
-        # Inventory
+        # Inventory, kept in ascending slot order
         self._inventory: Dict[int, Dict[str, Any]] = {}
 
-        # Message history and map state
+        # Message history and map state (keyed by utils._pos_key)
         self._messages: List[str] = []
-        self._map_cells: Dict[Tuple[int, int], str] = {}
-        self._tile_fg: Dict[Tuple[int, int], int] = {}
-        self._cell_features: Dict[Tuple[int, int], int] = {}
-        self._cell_overlays: Dict[Tuple[int, int], Dict[str, Any]] = {}
-        self._monsters: Dict[Tuple[int, int], Dict[str, Any]] = {}
+        # Monotonic count of messages seen, and the seq of the last "Unknown command"
+        self._msg_seq = 0
+        self._unknown_command_seq = 0
+        self._map_cells: Dict[int, str] = {}
+        self._tile_fg: Dict[int, int] = {}
+        self._cell_features: Dict[int, int] = {}
+        self._cell_overlays: Dict[int, Dict[str, Any]] = {}
+        # Monsters keyed by server id; each dict carries its packed "pos".
+        # _monster_pos maps a cell to the id of the monster on it; a move
+        # drops the old cell's entry. The monster's own "pos" is authoritative.
+        self._monsters: Dict[int, Dict[str, Any]] = {}
+        self._monster_pos: Dict[int, int] = {}
+        # Grid bucket (utils._grid_key) -> ids of monsters inside it
+        self._monster_grid: Dict[int, Dict[int, None]] = {}
         self._monster_names: Dict[int, str] = {}
+        # Floor items by cell
+        self._items: Dict[int, List[Dict[str, Any]]] = {}
+        # Landmark glyph -> cells currently showing it (dict used as an ordered set)
+        self._landmarks: Dict[str, Dict[int, None]] = {g: {} for g in _LANDMARKS}
 
         # Menu state
         self._current_menu: Optional[Dict[str, Any]] = None
@@ -90,6 +155,7 @@ class DCSSGame(GameState, GameActions, UIHandler, OverlayStats):
 
         # New: player status effects, piety, contamination, etc.
         self._status_effects: List[Dict[str, str]] = []
+        self._status_text = ""  # rendered once per status update
         self._poison_survival: int = 0
         self._real_hp_max: int = 0
         self._piety_rank: int = 0
@@ -112,9 +178,20 @@ class DCSSGame(GameState, GameActions, UIHandler, OverlayStats):
 
         # Notepad
         self._notepad: Dict[str, List[str]] = {}
+        self._notepad_total = 0  # notes across all pages
+
+        # Bumped whenever game state changes; GameState render caches key on it
+        self._state_version = 0
+        self._render_cache: Dict[str, Tuple[Tuple[int, bool], str]] = {}
+        # (id(menu/popup/item dict), field) -> (raw text, stripped text); see UIHandler._stripped
+        self._stripped_text: Dict[Tuple[int, str], Tuple[str, str]] = {}
 
     # --- Connection/lifecycle ---
 
+    def set_narrate_interval(self, n: int):
+        """Set how many actions may pass between narrate() calls (0 disables)."""
+        self._narrate_interval = int(n)
+
     def connect(self, url: str, username: str, password: str) -> bool:
         """Connect to DCSS webtiles server and login."""
         self._username = username
@@ -179,6 +256,7 @@ class DCSSGame(GameState, GameActions, UIHandler, OverlayStats):
         self._in_game = True
         self._is_dead = False
         self._messages.clear()
+        self._state_version += 1
 
         for _ in range(5):
             msgs = self._ws.recv_messages(timeout=1.0)
@@ -210,52 +288,62 @@ class DCSSGame(GameState, GameActions, UIHandler, OverlayStats):
 
     # --- Internals ---
 
+    def _blocked_error(self) -> List[str]:
+        """Explain which prompt, menu or popup is blocking a turn-consuming action."""
+        if self._pending_prompt:
+            if self._pending_prompt == "stat_increase":
+                return ["[ERROR: Stat increase prompt is waiting! Call choose_stat('s'), choose_stat('i'), or choose_stat('d') to pick Strength, Intelligence, or Dexterity.]"]
+            return [f"[ERROR: A prompt is pending: {self._pending_prompt}]"]
+        if self._current_menu:
+            title = self._current_menu.get("title", "a menu")
+            return [f"[ERROR: {title} is still open. Use read_ui() to see it, select_menu_item() to interact, or dismiss() to close it first.]"]
+        return ["[ERROR: A popup is still open. Use read_ui() to see it or dismiss() to close it first.]"]
+
     def _act(self, *keys: str, timeout: float = 5.0, menu_ok: bool = False) -> List[str]:
         """Send keys, wait for input_mode, return new messages."""
         if not self._ws or not self._in_game:
             return ["Not in game"]
 
-        NARRATE_INTERVAL = int(os.environ.get("DCSS_NARRATE_INTERVAL", "5"))
-        if NARRATE_INTERVAL > 0 and not menu_ok and self._actions_since_narrate >= NARRATE_INTERVAL:
-            return [f"[ERROR: You must call narrate() before continuing. You've taken {self._actions_since_narrate} actions without narrating for stream viewers.]"]
         if not menu_ok:
+            narrate_interval = self._narrate_interval
+            if narrate_interval > 0 and self._actions_since_narrate >= narrate_interval:
+                return [f"[ERROR: You must call narrate() before continuing. You've taken {self._actions_since_narrate} actions without narrating for stream viewers.]"]
             self._actions_since_narrate += 1
-
-        if not menu_ok and self._pending_prompt:
-            if self._pending_prompt == "stat_increase":
-                return ["[ERROR: Stat increase prompt is waiting! Call choose_stat('s'), choose_stat('i'), or choose_stat('d') to pick Strength, Intelligence, or Dexterity.]"]
-            return [f"[ERROR: A prompt is pending: {self._pending_prompt}]"]
-
-        if not menu_ok and self._current_menu:
-            title = self._current_menu.get("title", "a menu")
-            return [f"[ERROR: {title} is still open. Use read_ui() to see it, select_menu_item() to interact, or dismiss() to close it first.]"]
-        if not menu_ok and self._current_popup:
-            return ["[ERROR: A popup is still open. Use read_ui() to see it or dismiss() to close it first.]"]
+            # One combined test on the hot path; messages are built only when blocked
+            if self._pending_prompt or self._current_menu or self._current_popup:
+                return self._blocked_error()
 
         msg_start = len(self._messages)
+        unknown_before = self._unknown_command_seq
 
-        leftover = self._ws.recv_messages(timeout=0.05)
-        for msg in leftover:
-            self._process_msg(msg)
+        # Bound once: these are hit on every iteration of the receive loop
+        _time = time.time
+        ws = self._ws
+        recv = ws.recv_messages
+        send_key = ws.send_key
+        process = self._process_msg
+
+        for msg in recv(timeout=0.05):
+            process(msg)
 
         for key in keys:
-            self._ws.send_key(key)
+            send_key(key)
 
-        deadline = time.time() + timeout
+        deadline = _time() + timeout
         got_input = False
         got_player = False
 
-        while time.time() < deadline and not self._is_dead:
-            remaining = deadline - time.time()
+        while not self._is_dead:
+            remaining = deadline - _time()
             if remaining <= 0:
                 break
-            msgs = self._ws.recv_messages(timeout=min(0.5, remaining))
+            msgs = recv(timeout=min(0.5, remaining))
 
             if not msgs and remaining < 1.0:
                 logger.warning(f"_act timeout approaching, keys={keys}, got_input={got_input}, got_player={got_player}")
 
             for msg in msgs:
-                self._process_msg(msg)
+                process(msg)
                 mt = msg.get("msg")
                 if mt == "input_mode":
                     mode = msg.get("mode")
@@ -263,8 +351,9 @@ class DCSSGame(GameState, GameActions, UIHandler, OverlayStats):
                     if mode == 1:
                         got_input = True
                     elif mode == 5:
-                        self._ws.send_key(" ")
+                        send_key(" ")
                     elif mode == 7:
+                        # _messages may be rebound by process(), so read it fresh
                         recent = self._messages[-5:] if self._messages else []
                         stat_prompt = any("(S)trength" in m for m in recent)
                         if stat_prompt:
@@ -273,7 +362,7 @@ class DCSSGame(GameState, GameActions, UIHandler, OverlayStats):
                             got_input = True
                         else:
                             logger.info(f"Text input prompt during _act, escaping (keys={keys})")
-                            self._ws.send_key("key_esc")
+                            send_key("key_esc")
                     elif mode == 0:
                         pass
                     elif mode == 4:
@@ -283,7 +372,7 @@ class DCSSGame(GameState, GameActions, UIHandler, OverlayStats):
                         got_input = True
                     else:
                         logger.info(f"Unknown input_mode={mode}, escaping (keys={keys})")
-                        self._ws.send_key("key_esc")
+                        send_key("key_esc")
                 elif mt == "player":
                     got_player = True
                 elif mt == "close":
@@ -291,27 +380,27 @@ class DCSSGame(GameState, GameActions, UIHandler, OverlayStats):
                     self._is_dead = True
                     self._in_game = False
                     self._deaths += 1
-                elif mt in ("ui-push", "ui-state"):
+                elif mt in _UI_PUSH_MSGS:
                     ui_type = msg.get("type", "unknown")
                     logger.info(f"UI popup ({mt}) type={ui_type} during _act (keys={keys})")
                     self._handle_ui_msg(msg)
                     got_input = True
                 elif mt == "ui-pop":
                     self._current_popup = None
-                elif mt in ("menu", "update_menu", "update_menu_items"):
+                elif mt in _MENU_MSGS:
                     logger.info(f"Menu message ({mt}) tag={msg.get('tag', '?')} during _act (keys={keys})")
                     self._handle_menu_msg(msg)
                     got_input = True
-                elif mt in ("close_menu", "close_all_menus"):
+                elif mt in _CLOSE_MENU_MSGS:
                     self._current_menu = None
                     self._menu_items = []
 
             if got_input and got_player:
                 break
             if got_input:
-                extra = self._ws.recv_messages(timeout=0.1)
+                extra = recv(timeout=0.1)
                 for msg in extra:
-                    self._process_msg(msg)
+                    process(msg)
                     mt = msg.get("msg")
                     if mt == "close":
                         logger.info(f"Game closed (death) in extra recv. keys={keys}")
@@ -364,7 +453,7 @@ class DCSSGame(GameState, GameActions, UIHandler, OverlayStats):
 
         new_msgs = self._messages[msg_start:]
 
-        if any("Unknown command" in m for m in new_msgs):
+        if self._unknown_command_seq != unknown_before:
             new_msgs.append("[HINT: 'Unknown command' means a key you sent was invalid in this context. Check if you're sending the right arguments.]")
 
         return new_msgs
@@ -378,6 +467,9 @@ class DCSSGame(GameState, GameActions, UIHandler, OverlayStats):
             self._update_map(msg)
         elif mt == "msgs":
             self._update_messages(msg)
+        else:
+            return
+        self._state_version += 1
 
     def _update_player(self, msg: Dict[str, Any]):
         field_map = {
@@ -414,20 +506,28 @@ class DCSSGame(GameState, GameActions, UIHandler, OverlayStats):
                 # Clear stale map data on floor change
                 if json_key in ("place", "depth") and msg[json_key] != old_val:
                     self._monsters.clear()
-                    if hasattr(self, '_items'):
-                        self._items.clear()
+                    self._monster_pos.clear()
+                    self._monster_grid.clear()
+                    self._items.clear()
                     logger.debug(f"Floor changed ({json_key}: {old_val} → {msg[json_key]}), cleared monsters/items")
         if "pos" in msg:
             pos = msg["pos"]
             if isinstance(pos, dict):
                 self._position = (pos.get("x", 0), pos.get("y", 0))
         if "inv" in msg:
+            inventory = self._inventory
+            added = False
             for slot_str, item_data in msg["inv"].items():
                 slot = int(slot_str)
                 if item_data:
-                    self._inventory[slot] = item_data
+                    if slot not in inventory:
+                        added = True
+                    inventory[slot] = item_data
                 else:
-                    self._inventory.pop(slot, None)
+                    inventory.pop(slot, None)
+            if added:
+                # Keep slots in order so readers can iterate without sorting
+                self._inventory = {k: inventory[k] for k in sorted(inventory)}
         if "status" in msg:
             self._status_effects = []
             for s in msg["status"]:
@@ -440,62 +540,119 @@ class DCSSGame(GameState, GameActions, UIHandler, OverlayStats):
                     effect["desc"] = s["desc"]
                 if effect:
                     self._status_effects.append(effect)
+            self._status_text = ", ".join([s.get("light", s.get("text", "")) for s in self._status_effects
+                                           if s.get("light") or s.get("text")])
 
     def _update_map(self, msg: Dict[str, Any]):
         cells = msg.get("cells", [])
         if not cells:
             return
+        # Bind the per-field stores once; each cell then packs a single pos key
+        map_cells = self._map_cells
+        cell_features = self._cell_features
+        cell_overlays = self._cell_overlays
+        tile_fg = self._tile_fg
+        monsters = self._monsters
+        monster_pos = self._monster_pos
+        monster_grid = self._monster_grid
+        monster_names = self._monster_names
+        landmarks = self._landmarks
         cur_x, cur_y = None, None
         for cell in cells:
             if "x" in cell: cur_x = cell["x"]
             if "y" in cell: cur_y = cell["y"]
             if cur_x is not None and cur_y is not None:
+                pos = (cur_x << 16) | cur_y  # utils._pos_key, inlined
                 if "g" in cell:
-                    self._map_cells[(cur_x, cur_y)] = cell["g"]
+                    glyph = cell["g"]
+                    old = map_cells.get(pos)
+                    if old != glyph:
+                        if old in landmarks:
+                            landmarks[old].pop(pos, None)
+                        if glyph in landmarks:
+                            landmarks[glyph][pos] = None
+                        map_cells[pos] = glyph
                 if "f" in cell:
-                    self._cell_features[(cur_x, cur_y)] = cell["f"]
-                # Store cell overlays (silenced, sanctuary, halo, etc.)
-                overlay_keys = ("silenced", "sanctuary", "halo", "liquefied",
-                                "orb_glow", "quad_glow", "disjunct", "awakened_forest",
-                                "blasphemy", "highlighted_summoner")
-                overlays = {}
-                for ok in overlay_keys:
-                    if ok in cell:
-                        overlays[ok] = cell[ok]
-                if overlays:
-                    self._cell_overlays[(cur_x, cur_y)] = overlays
-                elif (cur_x, cur_y) in self._cell_overlays:
+                    cell_features[pos] = cell["f"]
+                # Store cell overlays (silenced, sanctuary, halo, etc.).
+                # Most cells carry none, so test that with one C-level check first.
+                if not cell.keys().isdisjoint(_OVERLAY_KEY_SET):
+                    cell_overlays[pos] = {k: cell[k] for k in _OVERLAY_KEYS if k in cell}
+                elif pos in cell_overlays:
                     # Clear overlays if cell updated without them
-                    del self._cell_overlays[(cur_x, cur_y)]
+                    del cell_overlays[pos]
                 # Store fg tile flags for behavior/status decoding
                 if "fg" in cell:
                     fg = cell["fg"]
-                    if isinstance(fg, list):
+                    if fg.__class__ is list:
                         # [lo, hi] split for 64-bit values
-                        self._tile_fg[(cur_x, cur_y)] = (fg[1] << 32) | (fg[0] & 0xFFFFFFFF)
+                        lo, hi = fg
+                        tile_fg[pos] = (hi << 32) | (lo & _FG_LO_MASK)
                     else:
-                        self._tile_fg[(cur_x, cur_y)] = fg
+                        tile_fg[pos] = fg
                 if "mon" in cell:
                     if cell["mon"]:
                         mon_data = cell["mon"]
                         mon_id = mon_data.get("id")
                         if "name" in mon_data and mon_id is not None:
-                            self._monster_names[mon_id] = mon_data["name"]
-                        existing = self._monsters.get((cur_x, cur_y), {})
+                            monster_names[mon_id] = mon_data["name"]
+                        # Updates are diffs against the cell's previous occupant, and
+                        # the id is omitted when that occupant is unchanged
+                        prev_key = monster_pos.get(pos)
+                        prev = monsters.get(prev_key) if prev_key is not None else None
+                        if prev is not None and prev["pos"] != pos:
+                            prev_key = prev = None  # occupant has since moved on
+                        if mon_id is not None:
+                            key = mon_id
+                        elif prev_key is not None:
+                            key = prev_key
+                        else:
+                            key = -1 - pos  # no id seen for this cell yet
+                        existing = monsters.get(key)
+                        old_pos = existing["pos"] if existing is not None else None
+                        if key != prev_key:
+                            # A different monster is now here: rebuild its record on
+                            # top of the previous occupant, which it replaces
+                            if prev is not None:
+                                del monsters[prev_key]
+                                del monster_grid[_grid_key(pos)][prev_key]
+                            if existing is None:
+                                existing = monsters[key] = {}
+                            else:
+                                existing.clear()
+                            if prev is not None:
+                                existing.update(prev)
+                        elif existing is None:
+                            existing = monsters[key] = {}
                         existing.update(mon_data)
-                        if "name" not in existing and mon_id in self._monster_names:
-                            existing["name"] = self._monster_names[mon_id]
-                        self._monsters[(cur_x, cur_y)] = existing
-                    elif (cur_x, cur_y) in self._monsters:
-                        del self._monsters[(cur_x, cur_y)]
+                        existing["pos"] = pos
+                        if old_pos != pos:
+                            if old_pos is not None:
+                                del monster_grid[_grid_key(old_pos)][key]
+                                if monster_pos.get(old_pos) == key:
+                                    del monster_pos[old_pos]
+                            monster_grid.setdefault(_grid_key(pos), {})[key] = None
+                        if "name" not in existing and mon_id in monster_names:
+                            existing["name"] = monster_names[mon_id]
+                        monster_pos[pos] = key
+                    elif pos in monster_pos:
+                        # Only drop the monster if it is still recorded at this cell
+                        key = monster_pos.pop(pos)
+                        mon = monsters.get(key)
+                        if mon is not None and mon["pos"] == pos:
+                            del monsters[key]
+                            del monster_grid[_grid_key(pos)][key]
                 cur_x += 1
 
     def _update_messages(self, msg: Dict[str, Any]):
         for m in msg.get("messages", []):
             text = m.get("text", "")
             if text:
-                clean = re.sub(r'<[^>]+>', '', text).strip()
+                clean = _strip_html(text).strip()
                 if clean:
+                    self._msg_seq += 1
+                    if "Unknown command" in clean:
+                        self._unknown_command_seq = self._msg_seq
                     self._messages.append(clean)
         if len(self._messages) > 200:
             self._messages = self._messages[-100:]
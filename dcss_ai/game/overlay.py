@@ -4,17 +4,29 @@ import os
 import logging
 from dcss_ai.overlay import send_stats, send_thought
 
+try:
+    import orjson
+    _loads = orjson.loads
+    _dumps = orjson.dumps
+except ImportError:
+    _loads = json.loads
+
+    def _dumps(obj) -> bytes:
+        return json.dumps(obj).encode()
+
 logger = logging.getLogger(__name__)
 
 
 class OverlayStats:
     """Mixin providing stream overlay statistics."""
 
+    __slots__ = ()
+
     def _load_persistent_stats(self):
         """Load attempt/win/death counts from overlay stats file."""
         try:
-            with open(self._stats_path) as f:
-                data = json.load(f)
+            with open(self._stats_path, "rb") as f:
+                data = _loads(f.read())
                 self._attempt = data.get("attempt", 0)
                 self._wins = data.get("wins", 0)
                 self._deaths = data.get("deaths", 0)
@@ -41,11 +53,14 @@ class OverlayStats:
         send_stats(data)
         if thought:
             send_thought(thought)
-        # Fallback: write stats file
+        # Fallback: write stats file (tmp + rename so readers never see a partial file)
         try:
-            os.makedirs(os.path.dirname(self._stats_path), exist_ok=True)
-            with open(self._stats_path, "w") as f:
-                json.dump(data, f)
+            if not self._stats_dir_ready:
+                os.makedirs(os.path.dirname(self._stats_path), exist_ok=True)
+                self._stats_dir_ready = True
+            with open(self._stats_tmp_path, "wb") as f:
+                f.write(_dumps(data))
+            os.replace(self._stats_tmp_path, self._stats_path)
         except OSError:
             pass
 
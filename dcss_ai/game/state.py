@@ -1,12 +1,85 @@
 """GameState mixin: property accessors and state query methods."""
+from functools import wraps
 from typing import List, Dict, Tuple, Any
 
-from .utils import _strip_formatting
+from .utils import (_pos_key, _unpack_key, _LANDMARKS,
+                    _GRID_SHIFT, _POS_STEP_X, _SLOT_LETTERS)
+
+# Monster names get_nearby_enemies never reports
+_ENEMY_IGNORE = frozenset({
+    'plant', 'withered plant', 'fungus', 'toadstool', 'bush',
+    'ballistomycete spore', 'briar patch', 'pillar of salt',
+    'block of ice', 'spectral weapon',
+})
+# Monsters reported as at least "dangerous" whatever the server's threat value
+_KNOWN_DANGEROUS = frozenset({
+    'sigmund', 'jessica', 'edmund', 'eustachio', 'natasha',
+    'robin, the goblin', 'ijyb', 'terence',
+    'ogre', 'centaur', 'gnoll sergeant', 'orc priest', 'orc wizard',
+})
+_THREAT_LABELS = ("trivial", "easy", "dangerous", "extremely dangerous")
+
+# Compass direction keyed by (sign(dx), sign(dy)); screen y grows southward
+_DIR8 = {
+    (-1, -1): "NW", (0, -1): "N", (1, -1): "NE",
+    (-1, 0): "W", (0, 0): "here", (1, 0): "E",
+    (-1, 1): "SW", (0, 1): "S", (1, 1): "SE",
+}
+_DIR8_LOWER = {k: v.lower() for k, v in _DIR8.items()}
+
+# get_stats piety display by rank (0-6) and contamination labels by level
+_PIETY_STARS = tuple("★" * i + "☆" * (6 - i) for i in range(7))
+_CONTAM_LEVELS = ("", "glow", "glow+", "GLOW!", "GLOW!!")
+
+# get_state_text inventory tags and environment labels (in display order)
+_EQUIP_TAGS = {"weapon": " (wielded)", "offhand": " (offhand)"}
+_ENV_LABELS = (
+    ("silenced", "SILENCED (no spells!)"),
+    ("sanctuary", "Sanctuary (no combat)"),
+    ("halo", "Halo"),
+    ("liquefied", "Liquefied ground"),
+    ("orb_glow", None),  # shows its value, see get_state_text
+    ("disjunct", "Disjunction"),
+)
+
+
+def _build_status_table(beh_table, mdam_table, beh_mask, mdam_mask):
+    """Map every masked behavior|damage value to its status text."""
+    beh_step = beh_mask & -beh_mask
+    mdam_step = mdam_mask & -mdam_mask
+    table = {}
+    for beh in range(0, beh_mask + 1, beh_step):
+        for mdam in range(0, mdam_mask + 1, mdam_step):
+            parts = [p for p in (beh_table.get(beh), mdam_table.get(mdam)) if p]
+            table[beh | mdam] = ", ".join(parts)
+    return table
+
+
+def _cached_render(method):
+    """Cache a no-argument text renderer until the game state next changes.
+
+    The cache key is the state version bumped by _process_msg, plus _is_dead,
+    which the action loop and driver also set directly.
+    """
+    name = method.__name__
+
+    @wraps(method)
+    def wrapper(self):
+        key = (self._state_version, self._is_dead)
+        hit = self._render_cache.get(name)
+        if hit is not None and hit[0] == key:
+            return hit[1]
+        text = method(self)
+        self._render_cache[name] = (key, text)
+        return text
+    return wrapper
 
 
 class GameState:
     """Mixin providing read-only state accessors and query methods."""
 
+    __slots__ = ()
+
     @property
     def hp(self) -> int: return self._hp
     @property
@@ -68,18 +141,18 @@ class GameState:
         """Get environmental overlays at a position (default: player position)."""
         if pos is None:
             pos = self._position
-        return self._cell_overlays.get(pos, {})
+        return self._cell_overlays.get(_pos_key(*pos), {})
 
     def get_inventory(self) -> List[Dict[str, Any]]:
         items = []
-        for slot, data in sorted(self._inventory.items()):
-            if slot >= 52:  # virtual slots (quiver etc) — skip
-                continue
+        for slot, data in self._inventory.items():
+            if slot >= 52:  # virtual slots (quiver etc) sort last
+                break
             name = data.get("name", "")
             if not name or name == "?":
                 continue
             item = {
-                "slot": chr(ord('a') + slot) if slot < 26 else chr(ord('A') + slot - 26),
+                "slot": _SLOT_LETTERS[slot],
                 "name": name,
                 "quantity": data.get("quantity", 1),
             }
@@ -99,33 +172,33 @@ class GameState:
         if not self._map_cells:
             return "No map data available"
         px, py = self._position
+        get = self._map_cells.get
+        side = 2 * radius + 1
+        blank = " " * side
         lines = []
         for y in range(py - radius, py + radius + 1):
-            line = ""
-            for x in range(px - radius, px + radius + 1):
-                if (x, y) == (px, py):
-                    line += "@"
-                elif (x, y) in self._map_cells:
-                    line += self._map_cells[(x, y)]
-                else:
-                    line += " "
-            lines.append(line)
+            if y < 0:
+                lines.append(blank)
+                continue
+            # Keys along a row are evenly spaced, so the window row is one range
+            start = _pos_key(px - radius, y)
+            row = [get(k, " ") for k in range(start, start + side * _POS_STEP_X, _POS_STEP_X)]
+            if y == py:
+                row[radius] = "@"
+            lines.append("".join(row))
         return "\n".join(lines)
 
+    @_cached_render
     def get_landmarks(self) -> str:
-        LANDMARKS = {'>': 'downstairs', '<': 'upstairs', '_': 'altar', '+': 'door'}
         px, py = self._position
         found = []
-        for (x, y), glyph in self._map_cells.items():
-            if glyph in LANDMARKS:
+        for glyph, cells in self._landmarks.items():
+            for key in cells:
+                x, y = _unpack_key(key)
                 dx, dy = x - px, y - py
                 dist = max(abs(dx), abs(dy))
-                direction = ""
-                if dy < 0: direction += "N"
-                elif dy > 0: direction += "S"
-                if dx > 0: direction += "E"
-                elif dx < 0: direction += "W"
-                found.append({"type": LANDMARKS[glyph], "glyph": glyph, "direction": direction or "here", "distance": dist, "x": dx, "y": dy})
+                direction = _DIR8[(dx > 0) - (dx < 0), (dy > 0) - (dy < 0)]
+                found.append({"type": _LANDMARKS[glyph], "glyph": glyph, "direction": direction, "distance": dist, "x": dx, "y": dy})
         type_order = {'downstairs': 0, 'upstairs': 1, 'altar': 2, 'door': 3}
         found.sort(key=lambda f: (type_order.get(f['type'], 9), f['distance']))
         if not found:
@@ -156,23 +229,21 @@ class GameState:
             return "No map data available"
 
         # Find all target positions
-        targets = set()
-        for (x, y), g in self._map_cells.items():
-            if g == target_glyph:
-                targets.add((x, y))
+        targets = self._landmarks[target_glyph]
         if not targets:
             return f"No {target} found on current floor"
 
         # Walkable check — anything that isn't a wall or unknown
         walkable = frozenset({'.', '+', '\'', '>', '<', '_', '@', ','})
-        def is_walkable(x, y):
-            g = self._map_cells.get((x, y))
+        map_cells = self._map_cells
+        def is_walkable(key):
+            g = map_cells.get(key)
             return g is not None and g in walkable
 
         # BFS from player position
         queue = deque()
         queue.append((px, py, None))  # x, y, first_step_direction
-        visited = {(px, py)}
+        visited = {_pos_key(px, py)}
         
         DIRS = [
             (0, -1, 'n'), (0, 1, 's'), (-1, 0, 'w'), (1, 0, 'e'),
@@ -183,13 +254,14 @@ class GameState:
             x, y, first_dir = queue.popleft()
             for dx, dy, dname in DIRS:
                 nx, ny = x + dx, y + dy
-                if (nx, ny) in visited:
+                nkey = _pos_key(nx, ny)
+                if nkey in visited:
                     continue
-                if not is_walkable(nx, ny):
+                if not is_walkable(nkey):
                     continue
-                visited.add((nx, ny))
+                visited.add(nkey)
                 step_dir = first_dir or dname  # remember which direction we went first
-                if (nx, ny) in targets:
+                if nkey in targets:
                     dist = max(abs(nx - px), abs(ny - py))
                     return f"Move {step_dir} (path to {target}, {dist} tiles away)"
                 queue.append((nx, ny, step_dir))
@@ -209,68 +281,62 @@ class GameState:
     _MDAM_SEV     = 0x100000000
     _MDAM_ADEAD   = 0x1C0000000
 
-    def _decode_monster_status(self, pos: tuple) -> str:
-        """Decode behavior and damage flags from tile fg value."""
-        fg = self._tile_fg.get(pos, 0)
-        parts = []
-        beh = fg & self._BEH_MASK
-        if beh == self._STAB:
-            parts.append("sleeping")
-        elif beh == self._MAY_STAB:
-            parts.append("unaware")
-        elif beh == self._FLEEING:
-            parts.append("fleeing")
-        elif beh == self._PARALYSED:
-            parts.append("paralysed")
-        mdam = fg & self._MDAM_MASK
-        if mdam == self._MDAM_LIGHT:
-            parts.append("lightly wounded")
-        elif mdam == self._MDAM_MOD:
-            parts.append("moderately wounded")
-        elif mdam == self._MDAM_HEAVY:
-            parts.append("heavily wounded")
-        elif mdam == self._MDAM_SEV:
-            parts.append("severely wounded")
-        elif mdam == self._MDAM_ADEAD:
-            parts.append("almost dead")
-        return ", ".join(parts) if parts else ""
+    _BEH_TABLE = {
+        _STAB: "sleeping", _MAY_STAB: "unaware",
+        _FLEEING: "fleeing", _PARALYSED: "paralysed",
+    }
+    _MDAM_TABLE = {
+        _MDAM_LIGHT: "lightly wounded", _MDAM_MOD: "moderately wounded",
+        _MDAM_HEAVY: "heavily wounded", _MDAM_SEV: "severely wounded",
+        _MDAM_ADEAD: "almost dead",
+    }
+
+    # Status text for every (behavior | damage) bit combination, so decoding
+    # is one mask and one lookup
+    _STATUS_MASK = _BEH_MASK | _MDAM_MASK
+    _STATUS_TABLE = _build_status_table(_BEH_TABLE, _MDAM_TABLE, _BEH_MASK, _MDAM_MASK)
+
+    def _decode_monster_status(self, pos: int) -> str:
+        """Decode behavior and damage flags from tile fg value at a packed pos key."""
+        return self._STATUS_TABLE[self._tile_fg.get(pos, 0) & self._STATUS_MASK]
 
     def get_nearby_enemies(self) -> List[Dict[str, Any]]:
-        IGNORE = {'plant', 'withered plant', 'fungus', 'toadstool', 'bush',
-                  'ballistomycete spore', 'briar patch', 'pillar of salt',
-                  'block of ice', 'spectral weapon'}
         px, py = self._position
+        monsters = self._monsters
+        grid = self._monster_grid
+        # Distance 8 is under one grid cell, so the 3x3 buckets around us cover it
+        bx, by = px >> _GRID_SHIFT, py >> _GRID_SHIFT
+        nearby = []
+        for gy in (by - 1, by, by + 1):
+            for gx in (bx - 1, bx, bx + 1):
+                bucket = grid.get(_pos_key(gx, gy))
+                if bucket:
+                    nearby.extend(bucket)
         enemies = []
-        for (mx, my), mon in self._monsters.items():
-            if not mon:
-                continue
+        for mid in nearby:
+            mon = monsters[mid]
+            key = mon["pos"]
+            mx, my = _unpack_key(key)
             dx, dy = mx - px, my - py
             dist = max(abs(dx), abs(dy))
             if dist > 8:
                 continue
             name = mon.get("name", "unknown").lower()
-            if name in IGNORE:
+            if name in _ENEMY_IGNORE:
                 continue
-            direction = ""
-            if dy < 0: direction += "n"
-            elif dy > 0: direction += "s"
-            if dx > 0: direction += "e"
-            elif dx < 0: direction += "w"
-            status = self._decode_monster_status((mx, my))
+            direction = _DIR8_LOWER[(dx > 0) - (dx < 0), (dy > 0) - (dy < 0)]
+            status = self._decode_monster_status(key)
             # Threat level: use server value, but override for known dangerous monsters
-            KNOWN_DANGEROUS = {
-                'sigmund', 'jessica', 'edmund', 'eustachio', 'natasha',
-                'robin, the goblin', 'ijyb', 'terence',
-                'ogre', 'centaur', 'gnoll sergeant', 'orc priest', 'orc wizard',
-            }
             raw_threat = mon.get("threat", 0)
-            if name in KNOWN_DANGEROUS and raw_threat < 2:
+            if name in _KNOWN_DANGEROUS and raw_threat < 2:
                 raw_threat = 2  # at least "dangerous"
             
-            threat_labels = {0: "trivial", 1: "easy", 2: "dangerous", 3: "extremely dangerous"}
-            threat_label = threat_labels.get(raw_threat, f"unknown({raw_threat})")
+            if raw_threat.__class__ is int and 0 <= raw_threat < 4:
+                threat_label = _THREAT_LABELS[raw_threat]
+            else:
+                threat_label = f"unknown({raw_threat})"
             
-            enemies.append({"name": mon.get("name", "unknown"), "x": dx, "y": dy, "direction": direction or "here", "distance": dist, "threat": threat_label, "status": status})
+            enemies.append({"name": mon.get("name", "unknown"), "x": dx, "y": dy, "direction": direction, "distance": dist, "threat": threat_label, "status": status})
         enemies.sort(key=lambda e: e["distance"])
         return enemies
 
@@ -283,12 +349,10 @@ class GameState:
     }
 
     def _get_status_text(self) -> str:
-        """Format active status effects into a readable string."""
-        if not self._status_effects:
-            return ""
-        lights = [s.get("light", s.get("text", "")) for s in self._status_effects if s.get("light") or s.get("text")]
-        return ", ".join(lights) if lights else ""
+        """Active status effects as a readable string (built in _update_player)."""
+        return self._status_text
 
+    @_cached_render
     def get_stats(self) -> str:
         char_info = f"{self._species} {self._title}".strip() if self._species else "Unknown"
         # Form
@@ -307,15 +371,18 @@ class GameState:
         defenses = f"{_stat_mod(self._ac, self._ac_mod, 'AC')} {_stat_mod(self._ev, self._ev_mod, 'EV')} {_stat_mod(self._sh, self._sh_mod, 'SH')}"
         god_str = self._god or "None"
         if self._god:
-            piety_stars = "★" * self._piety_rank + "☆" * (6 - self._piety_rank) if self._piety_rank else ""
+            rank = self._piety_rank
+            if 0 < rank < 7:
+                piety_stars = _PIETY_STARS[rank]
+            else:
+                piety_stars = "★" * rank + "☆" * (6 - rank) if rank else ""
             if piety_stars:
                 god_str += f" [{piety_stars}]"
             if self._penance:
                 god_str += " (PENANCE!)"
         contam_str = ""
         if self._contam > 0:
-            contam_levels = ["", "glow", "glow+", "GLOW!", "GLOW!!"]
-            contam_str = f" | Contam: {contam_levels[min(self._contam, 4)]}"
+            contam_str = f" | Contam: {_CONTAM_LEVELS[min(self._contam, 4)]}"
         noise_str = ""
         if self._adjusted_noise >= 0:
             noise_str = f" | Noise: {self._adjusted_noise}"
@@ -328,6 +395,7 @@ class GameState:
                 f"XL: {self._xl} ({self._xl_progress}%) | Gold: {self._gold} | Place: {self._place}:{self._depth} | "
                 f"God: {god_str}{contam_str}{noise_str}{doom_str}{lives_str}{status_str} | Turn: {self._turn}")
 
+    @_cached_render
     def get_tactical_readout(self) -> str:
         """Compact tactical readout to replace the large ASCII map."""
         px, py = self._position
@@ -337,7 +405,7 @@ class GameState:
         parts = []
         
         # Position info
-        current_cell = self._map_cells.get((px, py), ".")
+        current_cell = self._map_cells.get(_pos_key(px, py), ".")
         terrain_name = {"#": "wall", ".": "floor", "+": "door", "'": "open door", 
                        ">": "downstairs", "<": "upstairs", "~": "water", "≈": "deep water"}.get(current_cell, "unknown")
         parts.append(f"Position: {self._place or 'Unknown'}:{self._depth or '?'} ({terrain_name})")
@@ -349,12 +417,8 @@ class GameState:
                 if dx == 0 and dy == 0:
                     continue
                 nx, ny = px + dx, py + dy
-                cell = self._map_cells.get((nx, ny), " ")
-                direction = ""
-                if dy < 0: direction += "N"
-                elif dy > 0: direction += "S"
-                if dx > 0: direction += "E"
-                elif dx < 0: direction += "W"
+                cell = self._map_cells.get(_pos_key(nx, ny), " ")
+                direction = _DIR8[(dx > 0) - (dx < 0), (dy > 0) - (dy < 0)]
                 if cell == "#":
                     adj_tiles.append(f"{direction}:wall")
                 elif cell == "+":
@@ -372,38 +436,31 @@ class GameState:
         
         # Nearby items on ground (within 3 tiles)
         nearby_items = []
-        if hasattr(self, '_items'):
-            for (ix, iy), item_list in self._items.items():
+        if self._items:
+            for key, item_list in self._items.items():
                 if not item_list:
                     continue
+                ix, iy = _unpack_key(key)
                 dx, dy = ix - px, iy - py
                 dist = max(abs(dx), abs(dy))
                 if dist <= 3:
-                    direction = ""
-                    if dy < 0: direction += "N"
-                    elif dy > 0: direction += "S"
-                    if dx > 0: direction += "E"
-                    elif dx < 0: direction += "W"
+                    direction = _DIR8[(dx > 0) - (dx < 0), (dy > 0) - (dy < 0)]
                     for item in item_list[:2]:  # Max 2 items per location
                         item_name = item.get("name", "item")
-                        nearby_items.append(f"{item_name} ({direction or 'here'}, {dist})")
+                        nearby_items.append(f"{item_name} ({direction}, {dist})")
         
         if nearby_items:
             parts.append(f"Items: {', '.join(nearby_items[:5])}")  # Max 5 items total
         
         # Retreat options (nearest upstairs)
         nearest_up = None
-        for (x, y), glyph in self._map_cells.items():
-            if glyph == "<":
-                dx, dy = x - px, y - py
-                dist = max(abs(dx), abs(dy))
-                if nearest_up is None or dist < nearest_up[3]:
-                    direction = ""
-                    if dy < 0: direction += "N"
-                    elif dy > 0: direction += "S"
-                    if dx > 0: direction += "E"
-                    elif dx < 0: direction += "W"
-                    nearest_up = (x, y, direction or "here", dist)
+        for key in self._landmarks["<"]:
+            x, y = _unpack_key(key)
+            dx, dy = x - px, y - py
+            dist = max(abs(dx), abs(dy))
+            if nearest_up is None or dist < nearest_up[3]:
+                direction = _DIR8[(dx > 0) - (dx < 0), (dy > 0) - (dy < 0)]
+                nearest_up = (x, y, direction, dist)
         
         if nearest_up:
             # Add BFS pathfinding direction
@@ -418,54 +475,50 @@ class GameState:
         
         return " | ".join(parts)
 
+    @_cached_render
     def get_state_text(self) -> str:
-        parts = ["=== DCSS State ===", self.get_stats(), "", "--- Messages ---"]
-        for msg in self.get_messages(5):
-            parts.append(f"  {msg}")
+        # Each section is joined once and the sections are joined at the end
+        sections = ["=== DCSS State ===", self.get_stats(), "", "--- Messages ---"]
+        recent = self._messages[-5:]
+        if recent:
+            sections.append("\n".join([f"  {msg}" for msg in recent]))
         inv = self.get_inventory()
         if inv:
-            parts.append("")
-            parts.append("--- Inventory ---")
-            for item in inv:
-                equip_tag = f" (wielded)" if item.get("equipped") == "weapon" else f" (offhand)" if item.get("equipped") == "offhand" else ""
-                useless_tag = " [useless]" if item.get("useless") else ""
-                inscr_tag = f" {{{item['inscription']}}}" if item.get("inscription") else ""
-                parts.append(f"  {item['slot']}) {item['name']}{equip_tag}{useless_tag}{inscr_tag}")
+            sections.append("\n--- Inventory ---\n" + "\n".join([
+                f"  {item['slot']}) {item['name']}"
+                f"{_EQUIP_TAGS.get(item.get('equipped'), '')}"
+                f"{' [useless]' if item.get('useless') else ''}"
+                f"{' {' + item['inscription'] + '}' if item.get('inscription') else ''}"
+                for item in inv
+            ]))
         enemies = self.get_nearby_enemies()
         if enemies:
-            parts.append("")
-            parts.append("--- Enemies ---")
-            for e in enemies:
-                status_str = f", {e['status']}" if e.get('status') else ""
-                parts.append(f"  {e['name']} ({e['direction']}, dist {e['distance']}, threat {e['threat']}{status_str})")
+            sections.append("\n--- Enemies ---\n" + "\n".join([
+                f"  {e['name']} ({e['direction']}, dist {e['distance']}, threat {e['threat']}"
+                f"{', ' + e['status'] if e['status'] else ''})"
+                for e in enemies
+            ]))
         # Environmental effects at player position
         overlays = self.get_cell_overlays_at()
         if overlays:
-            env_effects = []
-            if overlays.get("silenced"): env_effects.append("SILENCED (no spells!)")
-            if overlays.get("sanctuary"): env_effects.append("Sanctuary (no combat)")
-            if overlays.get("halo"): env_effects.append("Halo")
-            if overlays.get("liquefied"): env_effects.append("Liquefied ground")
-            if overlays.get("orb_glow"): env_effects.append(f"Orb glow ({overlays['orb_glow']})")
-            if overlays.get("disjunct"): env_effects.append("Disjunction")
+            env_effects = [label or f"Orb glow ({overlays[key]})"
+                           for key, label in _ENV_LABELS if overlays.get(key)]
             if env_effects:
-                parts.append("")
-                parts.append(f"--- Environment: {', '.join(env_effects)} ---")
-        parts.append("")
-        parts.append("--- Tactical ---")
-        parts.append(self.get_tactical_readout())
+                sections.append(f"\n--- Environment: {', '.join(env_effects)} ---")
+        sections.append("\n--- Tactical ---\n" + self.get_tactical_readout())
         if self._is_dead:
-            parts.append("\n*** GAME OVER \u2014 YOU ARE DEAD ***")
-        return "\n".join(parts)
+            sections.append("\n*** GAME OVER \u2014 YOU ARE DEAD ***")
+        return "\n".join(sections)
 
     def write_note(self, text: str, page: str = "") -> str:
         if not page:
             page = f"{self._place}:{self._depth}" if self._place else "general"
-        if page not in self._notepad:
-            self._notepad[page] = []
-        self._notepad[page].append(text)
-        total = sum(len(v) for v in self._notepad.values())
-        return f"Note saved to [{page}] ({len(self._notepad[page])} notes on this page, {total} total)."
+        notes = self._notepad.get(page)
+        if notes is None:
+            notes = self._notepad[page] = []
+        notes.append(text)
+        self._notepad_total += 1
+        return f"Note saved to [{page}] ({len(notes)} notes on this page, {self._notepad_total} total)."
 
     def read_notes(self, page: str = "") -> str:
         if not self._notepad:
@@ -485,5 +538,6 @@ class GameState:
     def rip_page(self, page: str) -> str:
         if page in self._notepad:
             count = len(self._notepad.pop(page))
+            self._notepad_total -= count
             return f"Ripped out [{page}] ({count} notes removed)."
         return f"No page [{page}] to rip out."
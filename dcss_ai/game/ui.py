@@ -1,15 +1,66 @@
 """UIHandler mixin: menu and popup interaction."""
-import time
 import logging
 
 from .utils import _strip_formatting
 
 logger = logging.getLogger(__name__)
 
+# Popup fields shown after the body/prompt, in display order.
+_POPUP_EXTRA_FIELDS = ("description", "quote", "spells_description", "stats")
+
+# Messages that answer a key pressed in a menu: it closed, changed, or
+# opened something else. recv_messages returns as soon as one arrives.
+_MENU_RESPONSE_MSGS = frozenset(("close_menu", "menu", "update_menu", "update_menu_items", "ui-push"))
+
+
+def _menu_response(msg: dict) -> bool:
+    return msg.get("msg") in _MENU_RESPONSE_MSGS
+
+
+def _is_close_menu(msg: dict) -> bool:
+    return msg.get("msg") == "close_menu"
+
+
+def _is_ui_pop(msg: dict) -> bool:
+    return msg.get("msg") == "ui-pop"
+
 
 class UIHandler:
     """Mixin providing UI interaction methods (menus, popups)."""
 
+    __slots__ = ()
+
+    def _recv_response(self, predicate) -> list:
+        """Receive until predicate matches, plus whatever arrives right behind it.
+
+        The server follows a menu/popup response with player/map/msgs updates
+        in separate frames; a short drain picks those up so they aren't left
+        queued behind the next action.
+        """
+        # Some keys get no matching response (ignored key, msgs-only reply), so
+        # only hold out for one as long as the old fixed 0.3s sleep did
+        msgs = self._ws.recv_messages(timeout=0.3, predicate=predicate)
+        if not msgs:
+            msgs = self._ws.recv_messages(timeout=0.7)
+        if any(map(predicate, msgs)):
+            msgs.extend(self._ws.recv_messages(timeout=0.05))
+        return msgs
+
+    def _stripped(self, d: dict, field: str, text: str) -> str:
+        """_strip_formatting(text) for d's field, memoized while the text is unchanged.
+
+        Menu and popup dicts are re-read far more often than they change. The
+        memo lives beside them, keyed by the dict's id, so the server's
+        messages are left as received.
+        """
+        key = (id(d), field)
+        cached = self._stripped_text.get(key)
+        if cached is not None and cached[0] == text:
+            return cached[1]
+        stripped = _strip_formatting(text)
+        self._stripped_text[key] = (text, stripped)
+        return stripped
+
     def read_ui(self) -> str:
         if self._current_menu:
             return self.read_menu()
@@ -38,18 +89,20 @@ class UIHandler:
             title_text = title
         else:
             title_text = "Menu"
-        title_text = _strip_formatting(title_text)
+        title_text = self._stripped(m, "title", title_text)
         lines.append(f"=== {title_text} (type: {tag}) ===")
         more = m.get("more", "")
         if isinstance(more, dict):
             more = more.get("text", "")
-        more = _strip_formatting(more)
+        more = self._stripped(m, "more", more)
         if more:
             lines.append(more)
         for item in self._menu_items:
-            text = item.get("text", "")
-            text = _strip_formatting(text)
-            if not text.strip():
+            raw = item.get("text", "")
+            if not raw or raw.isspace():
+                continue
+            text = self._stripped(item, "text", raw)
+            if not text:
                 continue
             level = item.get("level", 2)
             hotkeys = item.get("hotkeys", [])
@@ -66,8 +119,7 @@ class UIHandler:
         if not self._current_menu:
             return "No menu is currently open."
         self._ws.send_key(key)
-        time.sleep(0.3)
-        msgs = self._ws.recv_messages(timeout=1.0)
+        msgs = self._recv_response(_menu_response)
         menu_closed = False
         for msg in msgs:
             self._process_msg(msg)
@@ -88,8 +140,7 @@ class UIHandler:
         if not self._current_menu:
             return "No menu is currently open."
         self._ws.send_key("key_esc")
-        time.sleep(0.3)
-        msgs = self._ws.recv_messages(timeout=1.0)
+        msgs = self._recv_response(_is_close_menu)
         for msg in msgs:
             self._process_msg(msg)
             if msg.get("msg") == "close_menu":
@@ -103,6 +154,7 @@ class UIHandler:
         mt = msg.get("msg")
         if mt == "menu":
             self._current_menu = msg
+            self._stripped_text.clear()
             self._menu_items = msg.get("items", [])
         elif mt == "update_menu":
             if self._current_menu:
@@ -125,6 +177,7 @@ class UIHandler:
         mt = msg.get("msg")
         if mt == "ui-push":
             self._current_popup = msg
+            self._stripped_text.clear()
         elif mt == "ui-state" and self._current_popup:
             for k, v in msg.items():
                 if k != "msg":
@@ -136,26 +189,26 @@ class UIHandler:
         p = self._current_popup
         ui_type = p.get("type", "unknown")
         lines = [f"=== Popup: {ui_type} ==="]
-        body = p.get("body", "")
-        if body:
-            if isinstance(body, str):
-                lines.append(_strip_formatting(body))
-            elif isinstance(body, dict):
-                lines.append(_strip_formatting(body.get("text", str(body))))
         title = p.get("title", "")
         if title:
             if isinstance(title, str):
-                lines.insert(1, _strip_formatting(title))
+                lines.append(self._stripped(p, "title", title))
             elif isinstance(title, dict):
-                lines.insert(1, _strip_formatting(title.get("text", "")))
+                lines.append(self._stripped(p, "title", title.get("text", "")))
+        body = p.get("body", "")
+        if body:
+            if isinstance(body, str):
+                lines.append(self._stripped(p, "body", body))
+            elif isinstance(body, dict):
+                lines.append(self._stripped(p, "body", body.get("text", str(body))))
         prompt = p.get("prompt", "")
         if prompt:
-            lines.append(_strip_formatting(prompt if isinstance(prompt, str) else str(prompt)))
-        for field in ("description", "quote", "spells_description", "stats"):
+            lines.append(self._stripped(p, "prompt", prompt if isinstance(prompt, str) else str(prompt)))
+        for field in _POPUP_EXTRA_FIELDS:
             val = p.get(field, "")
             if val:
                 text = val if isinstance(val, str) else str(val)
-                lines.append(_strip_formatting(text))
+                lines.append(self._stripped(p, field, text))
         if len(lines) == 1:
             data_keys = [k for k in p.keys() if k not in ("msg", "type", "generation_id")]
             lines.append(f"Data keys: {', '.join(data_keys)}")
@@ -165,8 +218,7 @@ class UIHandler:
         if not self._current_popup:
             return "No popup is currently open."
         self._ws.send_key("key_esc")
-        time.sleep(0.3)
-        msgs = self._ws.recv_messages(timeout=1.0)
+        msgs = self._recv_response(_is_ui_pop)
         for msg in msgs:
             self._process_msg(msg)
             if msg.get("msg") == "ui-pop":
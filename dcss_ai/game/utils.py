@@ -2,15 +2,63 @@
 import re
 
 
+# Markup tags, and tags plus DCSS section-sign codes, removed in one pass
+_HTML_RE = re.compile(r'<[^>]+>')
+_FMT_RE = re.compile(r'<[^>]+>|§.')
+# Section-sign codes alone, for text with no tags (no alternation to try)
+_SECT_RE = re.compile(r'§.')
+
+
 def _strip_formatting(text: str) -> str:
     """Strip DCSS formatting codes from text (e.g. color tags)."""
-    text = re.sub(r'<[^>]+>', '', text)
-    text = re.sub(r'§.', '', text)
-    return text.strip()
+    if '<' not in text:
+        if '§' not in text:
+            return text.strip()
+        return _SECT_RE.sub('', text).strip()
+    return _FMT_RE.sub('', text).strip()
 
 
 def _strip_html(text: str) -> str:
-    return re.sub(r'<[^>]+>', '', text)
+    return _HTML_RE.sub('', text)
+
+
+# Map positions are stored under a single packed int key rather than an
+# (x, y) tuple. DCSS coordinates are small and non-negative, so y fits in the
+# low 16 bits; an out-of-range (negative) coordinate packs to a negative key
+# that never matches a stored cell.
+_POS_SHIFT = 16
+_POS_MASK = 0xFFFF
+# Key distance between horizontally adjacent cells: a row is an arithmetic range
+_POS_STEP_X = 1 << _POS_SHIFT
+
+
+# Inventory slot letters by index (0-25 a-z, 26-51 A-Z), and the reverse map
+_SLOT_LETTERS = "abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ"
+_SLOT_INDEX = {c: i for i, c in enumerate(_SLOT_LETTERS)}
+
+# Glyphs indexed by GameState landmark queries, with their display names
+_LANDMARKS = {'>': 'downstairs', '<': 'upstairs', '_': 'altar', '+': 'door'}
+
+
+def _pos_key(x: int, y: int) -> int:
+    """Pack a map coordinate into the int key used by the map dicts."""
+    return (x << _POS_SHIFT) | y
+
+
+def _unpack_key(key: int) -> tuple:
+    """Inverse of _pos_key: return (x, y)."""
+    return key >> _POS_SHIFT, key & _POS_MASK
+
+
+# Monsters are bucketed on a coarse grid of _GRID_CELL x _GRID_CELL tiles so
+# range queries only visit nearby buckets.
+_GRID_SHIFT = 4
+_GRID_CELL = 1 << _GRID_SHIFT
+
+
+def _grid_key(key: int) -> int:
+    """Bucket key (itself a packed pos) for the grid cell containing a packed pos."""
+    return ((key >> (_POS_SHIFT + _GRID_SHIFT)) << _POS_SHIFT) | ((key & _POS_MASK) >> _GRID_SHIFT)
 
 
 class Direction:
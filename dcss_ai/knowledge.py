@@ -4,11 +4,78 @@
 Structured knowledge storage and retrieval system that replaces flat learnings.md.
 """
 
+import copy
 import json
+import logging
+import os
 from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
 from typing import Optional, Dict, List, Any
 
+logger = logging.getLogger(__name__)
+
+# orjson is several times faster for the log and knowledge files; fall back to stdlib json
+try:
+    import orjson
+    _loads = orjson.loads
+
+    def _dumps_indented(obj) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+except ImportError:
+    _loads = json.loads
+
+    def _dumps_indented(obj) -> bytes:
+        return json.dumps(obj, indent=2).encode()
+
+# games.jsonl files smaller than this are just read front to back
+_TAIL_MIN_SIZE = 64 * 1024
+_TAIL_CHUNK = 8192
+
+# Sort ranks for get_knowledge_for_context (lower sorts first)
+_THREAT_ORDER = {"high": 0, "medium": 1, "low": 2}
+_ITEM_PRIORITY = {"critical": 0, "high": 1, "medium": 2}
+
+# update_meta writes meta.json after this many unsaved games (see flush_meta)
+_META_FLUSH_EVERY = 10
+_RECENT_RESULTS = 20
+
+
+def _iter_lines_reversed(path: Path):
+    """Yield the raw lines of a file last-first, reading backward in chunks."""
+    with open(path, 'rb') as f:
+        pos = f.seek(0, 2)
+        partial = b''
+        while pos > 0:
+            step = min(_TAIL_CHUNK, pos)
+            pos -= step
+            f.seek(pos)
+            lines = (f.read(step) + partial).split(b'\n')
+            # lines[0] may continue in the previous chunk
+            partial = lines[0]
+            yield from reversed(lines[1:])
+        yield partial
+
+
+@lru_cache(maxsize=256)
+def _parse_place(place: str) -> tuple:
+    """Split a place like "Lair:3" into ("Lair", 3); depth is 0 if absent or invalid."""
+    if ':' in place:
+        branch, depth = place.split(':', 1)
+        try:
+            return branch, int(depth)
+        except ValueError:
+            return branch, 0
+    return place, 0
+
+
+def _write_json_atomic(path: Path, obj) -> None:
+    """Write obj as indented JSON via a temp file + rename, so a crash never
+    leaves a half-written knowledge file behind."""
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_bytes(_dumps_indented(obj))
+    os.replace(tmp, path)
+
 
 class KnowledgeBase:
     """Manages structured knowledge files for the DCSS AI.
@@ -40,6 +107,30 @@ class KnowledgeBase:
         self.builds_path = self.dir / "builds.json"
         self.games_path = self.dir / "games.jsonl"
         self.meta_path = self.dir / "meta.json"
+        
+        self._category_paths = {
+            "monsters": self.monsters_path,
+            "tactics": self.tactics_path,
+            "items": self.items_path,
+            "branches": self.branches_path,
+            "builds": self.builds_path,
+        }
+        # path -> ((mtime_ns, size), parsed data); skips re-parsing unchanged files
+        self._kb_cache: Dict[Path, tuple] = {}
+        # category -> (source dict, its entries in display order)
+        self._sorted_cache: Dict[str, tuple] = {}
+        
+        # meta.json is loaded once and kept in memory; flush_meta persists it
+        self._meta_cache: Optional[dict] = None
+        self._meta_unsaved = 0
+        
+        # Parse whatever knowledge exists now so the first prompt build is free.
+        # A bad file is left for its first real use to report.
+        for category in self._category_paths:
+            try:
+                self._cached_knowledge(category)
+            except (OSError, ValueError) as e:
+                logger.warning(f"Could not preload {category} knowledge: {e}")
     
     def record_game(self, game_data: dict) -> None:
         """Append structured game result to games.jsonl.
@@ -51,6 +142,8 @@ class KnowledgeBase:
                   species, background, god, inventory_summary,
                   nearby_enemies, last_messages
         """
+        # Load (and replay) meta first so update_meta doesn't count this game twice
+        self.get_meta()
         with open(self.games_path, 'a') as f:
             f.write(json.dumps(game_data) + '\n')
     
@@ -74,10 +167,22 @@ class KnowledgeBase:
             return []
         
         games = []
-        with open(self.games_path, 'r') as f:
+        if limit and self.games_path.stat().st_size >= _TAIL_MIN_SIZE:
+            # Only the tail is wanted: parse backward until we have enough
+            for line in _iter_lines_reversed(self.games_path):
+                if line.strip():
+                    entry = _loads(line)
+                    if outcome is None or entry.get("outcome") == outcome:
+                        games.append(entry)
+                        if len(games) >= limit:
+                            break
+            games.reverse()
+            return games
+        
+        with open(self.games_path, 'rb') as f:
             for line in f:
                 if line.strip():
-                    entry = json.loads(line)
+                    entry = _loads(line)
                     if outcome is None or entry.get("outcome") == outcome:
                         games.append(entry)
         
@@ -98,32 +203,74 @@ class KnowledgeBase:
                 - best_xl: highest XL reached
                 - avg_xl_at_death: average XL at death
                 - avg_turns_at_death: average turns at death
+                - sum_xl, sum_turns: running totals the averages derive from
                 - floors_reached: dict of floor -> count
-                - recent_results: list of recent game outcomes
+                - recent_results: list of the last 20 game outcomes
+                - games_log_offset: size of games.jsonl when meta.json was
+                  last written
         """
+        if self._meta_cache is None:
+            self._meta_cache = self._load_meta()
+        return self._meta_cache
+    
+    def _load_meta(self) -> dict:
         if not self.meta_path.exists():
-            return {
+            meta = {
                 "total_games": 0,
                 "total_deaths": 0,
                 "best_floor": "D:1",
                 "best_xl": 1,
                 "avg_xl_at_death": 0,
                 "avg_turns_at_death": 0,
+                "sum_xl": 0,
+                "sum_turns": 0,
                 "floors_reached": {},
-                "recent_results": []
+                "recent_results": [],
+                "games_log_offset": 0
             }
-        
-        with open(self.meta_path, 'r') as f:
-            return json.load(f)
+        else:
+            meta = _loads(self.meta_path.read_bytes())
+            
+            # Backfill running totals for meta.json files written before they existed
+            if "sum_xl" not in meta:
+                deaths = meta.get("total_deaths", 0)
+                meta["sum_xl"] = meta.get("avg_xl_at_death", 0) * deaths
+                meta["sum_turns"] = meta.get("avg_turns_at_death", 0) * deaths
+            
+            # Older meta.json was rewritten after every game, so it is current
+            if "games_log_offset" not in meta:
+                meta["games_log_offset"] = self._games_log_size()
+        
+        # Replay games logged after the last flush (e.g. the process was killed)
+        if self._games_log_size() > meta["games_log_offset"]:
+            with open(self.games_path, 'rb') as f:
+                f.seek(meta["games_log_offset"])
+                for line in f:
+                    if line.strip():
+                        self._apply_game(meta, _loads(line))
+                        self._meta_unsaved += 1
+        return meta
+    
+    def _games_log_size(self) -> int:
+        return self.games_path.stat().st_size if self.games_path.exists() else 0
     
     def update_meta(self, death_data: dict) -> None:
-        """Update meta.json after a death.
+        """Update run statistics after a game.
+        
+        The in-memory stats are updated immediately; meta.json is rewritten
+        every _META_FLUSH_EVERY games and on flush_meta().
         
         Args:
             death_data: Game data from record_game/record_death
         """
-        meta = self.get_meta()
+        self._apply_game(self.get_meta(), death_data)
         
+        self._meta_unsaved += 1
+        if self._meta_unsaved >= _META_FLUSH_EVERY:
+            self.flush_meta()
+    
+    @staticmethod
+    def _apply_game(meta: dict, death_data: dict) -> None:
         # Update counts
         meta["total_games"] += 1
         outcome = death_data.get("outcome", "death")
@@ -140,27 +287,17 @@ class KnowledgeBase:
         if xl > meta["best_xl"]:
             meta["best_xl"] = xl
         
-        # Parse floor depth for comparison
-        def floor_depth(place_str):
-            """Convert place string to numeric depth for comparison."""
-            try:
-                if ':' in place_str:
-                    branch, depth = place_str.split(':')
-                    return int(depth)
-                return 0
-            except:
-                return 0
-        
-        if floor_depth(place) > floor_depth(meta["best_floor"]):
+        # Compare floor depths
+        if _parse_place(place)[1] > _parse_place(meta["best_floor"])[1]:
             meta["best_floor"] = place
         
-        # Update averages
+        # Update averages from the running totals
         turns = death_data.get("turn", 0)
-        total_xl = meta["avg_xl_at_death"] * (meta["total_deaths"] - 1)
-        total_turns = meta["avg_turns_at_death"] * (meta["total_deaths"] - 1)
+        meta["sum_xl"] += xl
+        meta["sum_turns"] += turns
         
-        meta["avg_xl_at_death"] = (total_xl + xl) / meta["total_deaths"]
-        meta["avg_turns_at_death"] = (total_turns + turns) / meta["total_deaths"]
+        meta["avg_xl_at_death"] = meta["sum_xl"] / meta["total_deaths"]
+        meta["avg_turns_at_death"] = meta["sum_turns"] / meta["total_deaths"]
         
         # Track floors reached
         if place not in meta["floors_reached"]:
@@ -174,12 +311,22 @@ class KnowledgeBase:
             "turn": turns,
             "timestamp": death_data.get("timestamp")
         }
-        meta["recent_results"].append(result)
-        meta["recent_results"] = meta["recent_results"][-20:]
+        recent = meta["recent_results"]
+        recent.append(result)
+        if len(recent) > _RECENT_RESULTS:
+            del recent[:-_RECENT_RESULTS]
+    
+    def flush_meta(self) -> None:
+        """Write meta.json if there are games it doesn't include yet.
         
-        # Save
-        with open(self.meta_path, 'w') as f:
-            json.dump(meta, f, indent=2)
+        The games.jsonl size is saved alongside so that a later load can
+        replay any games recorded after this flush.
+        """
+        if self._meta_unsaved:
+            meta = self._meta_cache
+            meta["games_log_offset"] = self._games_log_size()
+            _write_json_atomic(self.meta_path, meta)
+            self._meta_unsaved = 0
     
     def get_knowledge_for_context(self, place: str = None, xl: int = None) -> str:
         """Load relevant knowledge as text for system prompt injection.
@@ -196,12 +343,11 @@ class KnowledgeBase:
         lines = ["## Knowledge from Previous Games\n"]
         
         # Load tactics (high confidence first)
-        tactics = self.get_knowledge("tactics")
+        tactics = self._cached_knowledge("tactics")
         if tactics:
             lines.append("### Combat Rules")
-            sorted_tactics = sorted(tactics.items(), 
-                                   key=lambda x: x[1].get("confidence", 0), 
-                                   reverse=True)
+            sorted_tactics = self._sorted_entries(
+                "tactics", tactics, lambda x: x[1].get("confidence", 0), reverse=True)
             for key, data in sorted_tactics[:8]:  # Top 8 rules
                 rule = data.get("rule", "")
                 confidence = data.get("confidence", 0)
@@ -210,45 +356,42 @@ class KnowledgeBase:
             lines.append("")
         
         # Load relevant monsters based on current depth
-        monsters = self.get_knowledge("monsters")
+        monsters = self._cached_knowledge("monsters")
         if monsters and place:
             lines.append("### Known Threats")
             
-            # Filter by relevance to current place
-            relevant = []
-            for name, data in monsters.items():
-                min_xl = data.get("min_xl", 0)
-                threat = data.get("threat", "medium")
-                
+            # Filter the threat-sorted entries by relevance to current place
+            by_threat = self._sorted_entries(
+                "monsters", monsters,
+                lambda x: _THREAT_ORDER.get(x[1].get("threat", "medium"), 1))
+            if xl is None:
+                relevant = by_threat
+            else:
                 # Show if we're near the expected level
-                if xl is None or min_xl <= xl + 3:
-                    relevant.append((name, data, threat))
+                max_min_xl = xl + 3
+                relevant = [x for x in by_threat if x[1].get("min_xl", 0) <= max_min_xl]
             
-            # Sort by threat level
-            threat_order = {"high": 0, "medium": 1, "low": 2}
-            relevant.sort(key=lambda x: threat_order.get(x[2], 1))
-            
-            for name, data, threat in relevant[:10]:  # Top 10 threats
+            for name, data in relevant[:10]:  # Top 10 threats
                 strategy = data.get("strategy", "")
                 lines.append(f"- {name}: {strategy}")
             lines.append("")
         
         # Load items (key items only)
-        items = self.get_knowledge("items")
+        items = self._cached_knowledge("items")
         if items:
             lines.append("### Key Items")
-            sorted_items = sorted(items.items(),
-                                key=lambda x: {"critical": 0, "high": 1, "medium": 2}.get(
-                                    x[1].get("priority", "medium"), 2))
+            sorted_items = self._sorted_entries(
+                "items", items,
+                lambda x: _ITEM_PRIORITY.get(x[1].get("priority", "medium"), 2))
             for key, data in sorted_items[:6]:  # Top 6 items
                 when = data.get("when", "")
                 lines.append(f"- {key}: {when}")
             lines.append("")
         
         # Load branch info if relevant
-        branches = self.get_knowledge("branches")
+        branches = self._cached_knowledge("branches")
         if branches and place:
-            branch_name = place.split(':')[0] if ':' in place else place
+            branch_name, depth = _parse_place(place)
             if branch_name in branches:
                 lines.append(f"### Current Branch: {branch_name}")
                 branch = branches[branch_name]
@@ -257,8 +400,7 @@ class KnowledgeBase:
                 
                 # Show relevant threats for current depth
                 threats = branch.get("key_threats_by_depth", {})
-                if place and ':' in place:
-                    depth = int(place.split(':')[1])
+                if ':' in place:
                     for depth_range, threat_list in threats.items():
                         if '-' in depth_range:
                             low, high = map(int, depth_range.split('-'))
@@ -269,7 +411,7 @@ class KnowledgeBase:
         
         # Load build info if in early game
         if xl is None or xl < 10:
-            builds = self.get_knowledge("builds")
+            builds = self._cached_knowledge("builds")
             if builds:
                 lines.append("### Build Strategies")
                 for build, data in builds.items():
@@ -279,6 +421,15 @@ class KnowledgeBase:
         
         return "\n".join(lines)
     
+    def _sorted_entries(self, category: str, data: dict, key, reverse: bool = False) -> list:
+        """data.items() sorted by key, reused until _cached_knowledge reloads data."""
+        cached = self._sorted_cache.get(category)
+        if cached is not None and cached[0] is data:
+            return cached[1]
+        entries = sorted(data.items(), key=key, reverse=reverse)
+        self._sorted_cache[category] = (data, entries)
+        return entries
+    
     def update_knowledge(self, category: str, key: str, data: dict) -> None:
         """Update a knowledge entry.
         
@@ -289,34 +440,20 @@ class KnowledgeBase:
             key: Knowledge entry key
             data: Data to merge
         """
-        category_map = {
-            "monsters": self.monsters_path,
-            "tactics": self.tactics_path,
-            "items": self.items_path,
-            "branches": self.branches_path,
-            "builds": self.builds_path,
-        }
-        
-        if category not in category_map:
+        path = self._category_paths.get(category)
+        if path is None:
             raise ValueError(f"Unknown category: {category}")
         
-        path = category_map[category]
-        
-        # Load existing
-        existing = {}
-        if path.exists():
-            with open(path, 'r') as f:
-                existing = json.load(f)
-        
-        # Merge
+        # Merge into a fresh load so the cached copy only changes via the file
+        existing = _loads(path.read_bytes()) if path.exists() else {}
         if key in existing:
             existing[key].update(data)
         else:
             existing[key] = data
         
         # Save
-        with open(path, 'w') as f:
-            json.dump(existing, f, indent=2)
+        _write_json_atomic(path, existing)
+        self._kb_cache.pop(path, None)
     
     def get_knowledge(self, category: str) -> dict:
         """Read a knowledge file.
@@ -325,23 +462,30 @@ class KnowledgeBase:
             category: One of "monsters", "tactics", "items", "branches", "builds"
             
         Returns:
-            Dict of knowledge entries, empty dict if file doesn't exist
+            Dict of knowledge entries, empty dict if file doesn't exist.
+            The dict is the caller's own copy; use update_knowledge to save changes.
         """
-        category_map = {
-            "monsters": self.monsters_path,
-            "tactics": self.tactics_path,
-            "items": self.items_path,
-            "branches": self.branches_path,
-            "builds": self.builds_path,
-        }
+        return copy.deepcopy(self._cached_knowledge(category))
+    
+    def _cached_knowledge(self, category: str) -> dict:
+        """Parsed knowledge file, cached until its mtime or size changes.
         
-        if category not in category_map:
+        The returned dict is shared with the cache and must not be modified.
+        """
+        path = self._category_paths.get(category)
+        if path is None:
             raise ValueError(f"Unknown category: {category}")
         
-        path = category_map[category]
-        
-        if not path.exists():
+        try:
+            st = path.stat()
+        except FileNotFoundError:
             return {}
         
-        with open(path, 'r') as f:
-            return json.load(f)
+        stamp = (st.st_mtime_ns, st.st_size)
+        cached = self._kb_cache.get(path)
+        if cached is not None and cached[0] == stamp:
+            return cached[1]
+        
+        data = _loads(path.read_bytes())
+        self._kb_cache[path] = (stamp, data)
+        return data
@@ -15,31 +15,89 @@ import json
 import logging
 import os
 import time
-from asyncio import Queue
-from typing import Set
+from collections import deque
+from itertools import islice
+from typing import Optional
+
+# orjson encodes straight to bytes and is much faster; fall back to stdlib json
+try:
+    import orjson
+    _dumps = orjson.dumps
+except ImportError:
+    def _dumps(obj) -> bytes:
+        return json.dumps(obj).encode()
 
 logger = logging.getLogger("dcss_ai.overlay")
 
-# Global event bus — overlay server reads, game/provider write
-_clients: Set[Queue] = set()
+# Seconds a client gets to send its request head before being dropped
+_HEADER_TIMEOUT = 5
+# Events kept for clients that are behind; older ones are dropped
+_BUFFER_SIZE = 256
+
+
+# "event: <name>\ndata: " header bytes per event name
+_EVENT_PREFIX = {
+    name: b"event: " + name.encode() + b"\ndata: "
+    for name in ("stats", "thought", "reset", "game_started")
+}
+
+
+# Global event bus — game/provider append, each SSE client reads from its
+# own cursor. Entries are (seq, msg, is_stats); one append per event no
+# matter how many overlays are connected.
+_buffer: deque = deque(maxlen=_BUFFER_SIZE)
+_seq = 0
+# Set (and replaced) on every broadcast, waking all waiting clients
+_wakeup = asyncio.Event()
+_client_count = 0
+# Last stats event broadcast: unchanged snapshots aren't resent, and new
+# clients get it straight away instead of waiting for the next change
+_last_stats: Optional[bytes] = None
 
 
 def broadcast(event: str, data: dict) -> None:
     """Send an SSE event to all connected clients. Non-blocking."""
-    msg = f"event: {event}\ndata: {json.dumps(data)}\n\n"
-    dead = []
-    for q in _clients:
-        try:
-            q.put_nowait(msg)
-        except asyncio.QueueFull:
-            dead.append(q)
-    for q in dead:
-        _clients.discard(q)
+    prefix = _EVENT_PREFIX.get(event)
+    if prefix is None:
+        prefix = _EVENT_PREFIX[event] = b"event: " + event.encode() + b"\ndata: "
+    _broadcast_msg(prefix + _dumps(data) + b"\n\n")
+
+
+def _broadcast_msg(msg: bytes, stats: bool = False) -> None:
+    global _seq, _wakeup
+    _seq += 1
+    _buffer.append((_seq, msg, stats))
+    _wakeup.set()
+    _wakeup = asyncio.Event()
+
+
+def _pending_since(last_seq: int) -> bytes:
+    """Concatenate events after last_seq, collapsing runs of stats to the last.
+
+    Stats are full snapshots, so a client that fell behind only needs the
+    newest of consecutive ones. A client that fell more than _BUFFER_SIZE
+    events behind resumes from the oldest event still buffered.
+    """
+    skip = max(0, len(_buffer) - (_seq - last_seq))
+    out = []
+    prev_stats = False
+    for _, msg, is_stats in islice(_buffer, skip, None):
+        if is_stats and prev_stats:
+            out[-1] = msg
+        else:
+            out.append(msg)
+        prev_stats = is_stats
+    return b"".join(out)
 
 
 def send_stats(stats: dict) -> None:
     """Push a stats update to all connected overlays."""
-    broadcast("stats", stats)
+    global _last_stats
+    msg = _EVENT_PREFIX["stats"] + _dumps(stats) + b"\n\n"
+    if msg == _last_stats:
+        return
+    _last_stats = msg
+    _broadcast_msg(msg, stats=True)
 
 
 def send_thought(text: str) -> None:
@@ -60,17 +118,27 @@ def send_game_started() -> None:
     broadcast("game_started", {})
 
 
-async def _handle_sse(reader, writer):
-    """Handle a single SSE client connection."""
-    # Read HTTP request
+async def _read_request_line(reader) -> bytes:
+    """Read the request head up to its blank line (CRLF or bare LF); return the first line."""
     request_line = await reader.readline()
-    # Read remaining headers
     while True:
         line = await reader.readline()
         if line == b"\r\n" or line == b"\n" or not line:
-            break
+            return request_line
 
-    path = request_line.decode().split(" ")[1] if request_line else "/"
+
+async def _handle_sse(reader, writer):
+    """Handle a single SSE client connection."""
+    global _client_count
+    # One deadline for the whole head; the reader's 64 KiB limit bounds each line
+    try:
+        request_line = await asyncio.wait_for(_read_request_line(reader), timeout=_HEADER_TIMEOUT)
+    except (ValueError, asyncio.TimeoutError, ConnectionResetError):
+        writer.close()
+        return
+
+    parts = request_line.split(b" ")
+    path = parts[1].decode(errors="replace") if len(parts) > 1 else "/"
 
     if path == "/events":
         # SSE response
@@ -84,24 +152,31 @@ async def _handle_sse(reader, writer):
         )
         await writer.drain()
 
-        q: Queue = Queue(maxsize=100)
-        _clients.add(q)
-        logger.info(f"SSE client connected ({len(_clients)} total)")
+        _client_count += 1
+        logger.info(f"SSE client connected ({_client_count} total)")
+        last_seq = _seq
         try:
+            if _last_stats is not None:
+                writer.write(_last_stats)
+                await writer.drain()
             # Send keepalive comment every 15s to prevent timeout
             while True:
-                try:
-                    msg = await asyncio.wait_for(q.get(), timeout=15)
-                    writer.write(msg.encode())
-                    await writer.drain()
-                except asyncio.TimeoutError:
-                    writer.write(b": keepalive\n\n")
-                    await writer.drain()
+                wakeup = _wakeup
+                if _seq == last_seq:
+                    try:
+                        await asyncio.wait_for(wakeup.wait(), timeout=15)
+                    except asyncio.TimeoutError:
+                        writer.write(b": keepalive\n\n")
+                        await writer.drain()
+                        continue
+                msg, last_seq = _pending_since(last_seq), _seq
+                writer.write(msg)
+                await writer.drain()
         except (ConnectionResetError, BrokenPipeError, asyncio.CancelledError):
             pass
         finally:
-            _clients.discard(q)
-            logger.info(f"SSE client disconnected ({len(_clients)} total)")
+            _client_count -= 1
+            logger.info(f"SSE client disconnected ({_client_count} total)")
             writer.close()
     elif path == "/" or path.startswith("/stream") or path.startswith("/overlay"):
         # Serve static files from dcss-stream directory
@@ -110,13 +185,17 @@ async def _handle_sse(reader, writer):
         filepath = os.path.join(static_dir, filename)
         try:
             with open(filepath, "rb") as f:
-                body = f.read()
-            ct = "text/html" if filepath.endswith(".html") else "application/octet-stream"
-            writer.write(f"HTTP/1.1 200 OK\r\nContent-Type: {ct}\r\nContent-Length: {len(body)}\r\nAccess-Control-Allow-Origin: *\r\n\r\n".encode())
-            writer.write(body)
-        except FileNotFoundError:
+                size = os.fstat(f.fileno()).st_size
+                ct = "text/html" if filepath.endswith(".html") else "application/octet-stream"
+                writer.write(f"HTTP/1.1 200 OK\r\nContent-Type: {ct}\r\nContent-Length: {size}\r\nAccess-Control-Allow-Origin: *\r\n\r\n".encode())
+                await writer.drain()
+                # Zero-copy os.sendfile where the transport supports it
+                await asyncio.get_running_loop().sendfile(writer.transport, f)
+        except (FileNotFoundError, IsADirectoryError):
             writer.write(b"HTTP/1.1 404 Not Found\r\nContent-Length: 0\r\n\r\n")
-        await writer.drain()
+            await writer.drain()
+        except (ConnectionResetError, BrokenPipeError):
+            pass
         writer.close()
     else:
         writer.write(b"HTTP/1.1 404 Not Found\r\nContent-Length: 0\r\n\r\n")
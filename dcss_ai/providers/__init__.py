@@ -1,29 +1,33 @@
 #!/usr/bin/env python3
 """Provider factory module."""
 
+from importlib import import_module
 from typing import Optional
 from .base import LLMProvider
 
+# name -> (module, class); modules are imported on first use
+_PROVIDERS = {
+    "copilot": (".copilot", "CopilotProvider"),
+    "mock": (".mock", "MockProvider"),
+}
+
 
 def get_provider(name: str, base_url: Optional[str] = None, api_key: Optional[str] = None) -> LLMProvider:
     """Get a provider instance by name.
     
     Args:
-        name: Provider name ("copilot")
+        name: Provider name ("copilot" or "mock")
         
     Returns:
         Provider instance
     """
-    if name == "copilot":
-        from .copilot import CopilotProvider
-        return CopilotProvider()
-    elif name == "mock":
-        from .mock import MockProvider
-        return MockProvider()
-    else:
-        raise ValueError(f"Unknown provider '{name}'. Available: copilot, mock")
+    try:
+        module, cls = _PROVIDERS[name]
+    except KeyError:
+        raise ValueError(f"Unknown provider '{name}'. Available: {', '.join(_PROVIDERS)}") from None
+    return getattr(import_module(module, __name__), cls)()
 
 
 def list_providers() -> list[str]:
     """Get list of available provider names."""
-    return ["copilot"]
+    return list(_PROVIDERS)
@@ -1,11 +1,9 @@
 #!/usr/bin/env python3
 """Abstract base classes for LLM providers."""
 
-import json
-import time
 from abc import ABC, abstractmethod
-from dataclasses import dataclass, field
-from typing import Any, Dict, List, Optional
+from dataclasses import dataclass
+from typing import Any, Dict, List
 
 
 from dcss_ai.overlay import send_thought, send_reset
@@ -27,9 +25,13 @@ def clear_monologue() -> None:
     send_reset()
 
 
-@dataclass
+@dataclass(slots=True)
 class SessionResult:
-    """Result from an LLM session interaction."""
+    """Result from an LLM session interaction.
+
+    usage is the session's live running totals, not a copy; read it before
+    the next send() if you need the figures for this call.
+    """
     completed: bool
     text: str
     usage: Dict[str, Any]
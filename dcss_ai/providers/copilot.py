@@ -2,6 +2,7 @@
 """Copilot SDK provider implementation."""
 
 import asyncio
+import json
 import logging
 import sys
 import time
@@ -15,6 +16,20 @@ from pydantic import BaseModel, Field
 from .base import LLMProvider, LLMSession, SessionResult, write_monologue, clear_monologue
 
 
+# Tool schemas are static, so each parameter model is built once per process
+# and shared by every session: (name, canonical schema JSON) -> model class
+_PARAM_MODELS: Dict[tuple, type] = {}
+
+
+def _param_model_for(tool_def: Dict[str, Any]) -> type:
+    """Return the cached parameter model for tool_def, building it on first use."""
+    key = (tool_def["name"], json.dumps(tool_def["parameters"], sort_keys=True))
+    model = _PARAM_MODELS.get(key)
+    if model is None:
+        model = _PARAM_MODELS[key] = _create_pydantic_model(tool_def)
+    return model
+
+
 def _create_pydantic_model(tool_def: Dict[str, Any]) -> type:
     """Create a Pydantic model class from a tool parameter schema."""
     
@@ -144,10 +159,13 @@ class CopilotSession(LLMSession):
                 self.session.send_and_wait({"prompt": message}, timeout=7200)
             )
             
-            # Poll until task completes or model goes silent
+            # Wait until task completes or model goes silent; wake at least
+            # once a second to check for shutdown and silence
             silent_limit = 60  # seconds of no output = stuck
             while not task.done():
-                await asyncio.sleep(1)
+                await asyncio.wait((task,), timeout=1)
+                if task.done():
+                    break
                 
                 # Check for shutdown signal
                 if self._shutdown:
@@ -159,7 +177,7 @@ class CopilotSession(LLMSession):
                     return SessionResult(
                         completed=False,
                         text="",
-                        usage=self.usage_totals.copy()
+                        usage=self.usage_totals
                     )
                 
                 since_delta = time.time() - self.last_delta_time
@@ -180,7 +198,7 @@ class CopilotSession(LLMSession):
                     return SessionResult(
                         completed=False,
                         text="",
-                        usage=self.usage_totals.copy()
+                        usage=self.usage_totals
                     )
             
             # Check if the task raised an exception
@@ -190,13 +208,13 @@ class CopilotSession(LLMSession):
             return SessionResult(
                 completed=True,
                 text="\n".join(self._all_text),
-                usage=self.usage_totals.copy()
+                usage=self.usage_totals
             )
         except asyncio.TimeoutError:
             return SessionResult(
                 completed=False,
                 text="",
-                usage=self.usage_totals.copy()
+                usage=self.usage_totals
             )
         except Exception as e:
             # API errors (missing finish_reason, etc.) — treat as non-fatal timeout
@@ -208,13 +226,13 @@ class CopilotSession(LLMSession):
                 return SessionResult(
                     completed=True,  # Signal driver to stop retrying
                     text="[SDK session expired]",
-                    usage=self.usage_totals.copy()
+                    usage=self.usage_totals
                 )
 
             return SessionResult(
                 completed=False,
                 text="",
-                usage=self.usage_totals.copy()
+                usage=self.usage_totals
             )
 
 
@@ -250,7 +268,7 @@ class CopilotProvider(LLMProvider):
             handler = tool_def["handler"]
             
             # Create Pydantic model for parameters
-            param_model = _create_pydantic_model(tool_def)
+            param_model = _param_model_for(tool_def)
             
             # Create Copilot tool function via factory to avoid closure bug
             tool_func = _make_copilot_tool(name, description, handler, param_model)
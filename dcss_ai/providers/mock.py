@@ -1,6 +1,7 @@
 #!/usr/bin/env python3
 """Mock LLM provider for CI testing. Executes a scripted sequence of tool calls."""
 
+from collections import deque
 from typing import Any, Dict, List, Optional
 
 from .base import LLMProvider, LLMSession, SessionResult
@@ -10,7 +11,7 @@ class MockSession(LLMSession):
     """A session that executes a pre-scripted sequence of tool calls."""
 
     def __init__(self, script: List[Dict[str, Any]], handlers: Dict[str, Any]):
-        self.script = list(script)  # copy
+        self.script = deque(script)  # copy; consumed from the front
         self.handlers = handlers
         self.results: List[Dict[str, Any]] = []  # log of calls + results
         self.usage_totals = {
@@ -25,7 +26,7 @@ class MockSession(LLMSession):
 
         # Execute tool calls until we hit a stop point or run out
         while self.script:
-            step = self.script.pop(0)
+            step = self.script.popleft()
 
             if step.get("stop"):
                 # Return control to driver (simulates LLM responding with text)
@@ -33,7 +34,7 @@ class MockSession(LLMSession):
                 return SessionResult(
                     completed=len(self.script) == 0,
                     text=step.get("text", ""),
-                    usage=self.usage_totals.copy(),
+                    usage=self.usage_totals,
                 )
 
             name = step["name"]
@@ -11,10 +11,21 @@ import re
 import threading
 
 logger = logging.getLogger(__name__)
-from typing import List, Dict, Any, Tuple, Optional
+from typing import Callable, List, Dict, Any, Tuple, Optional
 from collections import deque
 import websockets.sync.client
 
+# orjson is much faster for the per-frame decode; fall back to stdlib json
+try:
+    import orjson
+    _loads = orjson.loads
+
+    def _dumps(obj) -> str:
+        return orjson.dumps(obj).decode()
+except ImportError:
+    _loads = json.loads
+    _dumps = json.dumps
+
 
 class WebTilesConnection:
     """Pure Python WebSocket connection to DCSS webtiles."""
@@ -87,20 +98,26 @@ class WebTilesConnection:
         if not self._ws:
             raise RuntimeError("Not connected")
         try:
-            self._ws.send(json.dumps(data))
+            self._ws.send(_dumps(data))
         except websockets.exceptions.ConnectionClosed as e:
             logger.error(f"WebSocket connection closed during send: {e}")
             raise
         self._last_msg_time = time.time()
     
-    def recv_messages(self, timeout: float = 0.1) -> List[dict]:
+    def recv_messages(self, timeout: float = 0.1,
+                      predicate: Optional[Callable[[dict], bool]] = None) -> List[dict]:
         """Receive and return all available messages, waiting up to timeout seconds.
         Returns empty list on timeout.
+        
+        With a predicate, keep receiving until some message satisfies it (or
+        the timeout passes) instead of returning after the first batch.
         """
         result = []
         # Drain queue first
         while self._queue:
             result.append(self._queue.popleft())
+        if predicate is not None and any(map(predicate, result)):
+            return result
         
         # Try receiving from WebSocket
         deadline = time.time() + timeout
@@ -127,7 +144,8 @@ class WebTilesConnection:
                         result.extend(self._decode(raw2))
                 except (TimeoutError, websockets.exceptions.ConnectionClosed):
                     pass
-                break
+                if predicate is None or any(map(predicate, result)):
+                    break
         
         return result
     
@@ -158,17 +176,17 @@ class WebTilesConnection:
             # Binary: deflate-compressed
             data = raw + b'\x00\x00\xff\xff'
             try:
-                text = self._decompressor.decompress(data).decode('utf-8')
+                payload = self._decompressor.decompress(data)
             except Exception:
                 return []
             try:
-                msgs = json.loads(text).get("msgs", [])
-            except (json.JSONDecodeError, AttributeError):
+                msgs = _loads(payload).get("msgs", [])
+            except (ValueError, AttributeError):
                 return []
         elif isinstance(raw, str):
             try:
-                msgs = json.loads(raw).get("msgs", [])
-            except (json.JSONDecodeError, AttributeError):
+                msgs = _loads(raw).get("msgs", [])
+            except (ValueError, AttributeError):
                 return []
         else:
             return []
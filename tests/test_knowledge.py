@@ -81,6 +81,28 @@ class TestKnowledgeBase:
             assert len(deaths) == 3
             assert deaths[-1]["place"] == "D:5"
 
+    def test_get_games_tail_of_large_log(self):
+        """Test that the backward tail read matches a full read on a large log."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            kb = KnowledgeBase(Path(tmpdir))
+            
+            for i in range(600):
+                kb.record_game({
+                    "outcome": "win" if i % 7 == 0 else "death",
+                    "place": f"D:{i % 15 + 1}",
+                    "turn": i,
+                    "last_messages": ["x" * 150],
+                })
+            assert kb.games_path.stat().st_size > 64 * 1024
+            
+            with open(kb.games_path) as f:
+                everything = [json.loads(line) for line in f]
+            deaths = [g for g in everything if g["outcome"] == "death"]
+            
+            assert kb.get_games(limit=25) == everything[-25:]
+            assert kb.get_deaths(limit=40) == deaths[-40:]
+            assert kb.get_games(limit=1000) == everything
+
     def test_get_deaths_empty(self):
         """Test get_deaths on empty knowledge base."""
         with tempfile.TemporaryDirectory() as tmpdir:
@@ -159,6 +181,68 @@ class TestKnowledgeBase:
             assert meta["avg_xl_at_death"] == (2 + 4 + 6) / 3
             assert meta["avg_turns_at_death"] == (1000 + 2000 + 3000) / 3
 
+    def test_update_meta_backfills_old_schema(self):
+        """Test that meta.json without running totals is backfilled from averages."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            old_meta = KnowledgeBase(Path(tmpdir)).get_meta()
+            del old_meta["sum_xl"], old_meta["sum_turns"]
+            old_meta.update(total_games=2, total_deaths=2,
+                            avg_xl_at_death=3, avg_turns_at_death=1500)
+            kb = KnowledgeBase(Path(tmpdir))
+            with open(kb.meta_path, 'w') as f:
+                json.dump(old_meta, f)
+            
+            kb.update_meta({"place": "D:2", "xl": 6, "turn": 3000})
+            
+            meta = kb.get_meta()
+            assert meta["sum_xl"] == 12
+            assert meta["sum_turns"] == 6000
+            assert meta["avg_xl_at_death"] == 4
+            assert meta["avg_turns_at_death"] == 2000
+
+    def test_flush_meta(self):
+        """Test that meta.json is written on flush_meta and every N games."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            kb = KnowledgeBase(Path(tmpdir))
+            death_data = {"place": "D:2", "xl": 2, "turn": 500}
+            
+            kb.update_meta(death_data)
+            assert not kb.meta_path.exists()
+            kb.flush_meta()
+            assert KnowledgeBase(Path(tmpdir)).get_meta()["total_games"] == 1
+            
+            for _ in range(10):
+                kb.update_meta(death_data)
+            assert KnowledgeBase(Path(tmpdir)).get_meta()["total_games"] == 11
+
+    def test_meta_replays_unflushed_games(self):
+        """Test that games logged after the last flush are replayed on load."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            kb = KnowledgeBase(Path(tmpdir))
+            for xl in (2, 4):
+                game = {"place": "D:2", "xl": xl, "turn": 500}
+                kb.record_death(game)
+                kb.update_meta(game)
+            kb.flush_meta()
+            
+            # Killed before the next flush
+            for place in ("D:3", "D:5"):
+                game = {"place": place, "xl": 6, "turn": 900}
+                kb.record_death(game)
+                kb.update_meta(game)
+            
+            kb2 = KnowledgeBase(Path(tmpdir))
+            meta = kb2.get_meta()
+            assert meta["total_games"] == 4
+            assert meta["best_floor"] == "D:5"
+            assert meta["avg_xl_at_death"] == 4.5
+            assert len(meta["recent_results"]) == 4
+            assert json.loads(json.dumps(meta))["recent_results"][-1]["place"] == "D:5"
+            
+            # Flushing the replayed games means they aren't replayed again
+            kb2.flush_meta()
+            assert KnowledgeBase(Path(tmpdir)).get_meta()["total_games"] == 4
+
     def test_get_knowledge(self):
         """Test reading knowledge files."""
         with tempfile.TemporaryDirectory() as tmpdir:
@@ -179,6 +263,27 @@ class TestKnowledgeBase:
             assert "test_rule" in loaded
             assert loaded["test_rule"]["rule"] == "Test rule"
 
+    def test_get_knowledge_returns_copy(self):
+        """Test that modifying a get_knowledge result doesn't touch the cache."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            kb = KnowledgeBase(Path(tmpdir))
+            kb.update_knowledge("monsters", "goblin", {"threat": "low"})
+            
+            loaded = kb.get_knowledge("monsters")
+            loaded["goblin"]["threat"] = "extreme"
+            loaded["orc"] = {}
+            
+            assert kb.get_knowledge("monsters") == {"goblin": {"threat": "low"}}
+            assert "orc" not in kb.get_knowledge_for_context(place="D:1")
+            assert "goblin" in kb.get_knowledge_for_context(place="D:1")
+
+    def test_init_survives_corrupt_knowledge_file(self):
+        """Test that one unreadable category doesn't break construction."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            (Path(tmpdir) / "tactics.json").write_text('{"half_written": ')
+            kb = KnowledgeBase(Path(tmpdir))
+            assert kb.get_knowledge("monsters") == {}
+
     def test_get_knowledge_empty(self):
         """Test reading non-existent knowledge file."""
         with tempfile.TemporaryDirectory() as tmpdir:
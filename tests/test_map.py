@@ -0,0 +1,73 @@
+"""Tests for monster tracking in map updates."""
+
+import tempfile
+
+from dcss_ai.game.utils import _pos_key, _grid_key
+from tests.test_ui import _make_game
+
+
+def _map(game, *cells):
+    game._process_msg({"msg": "map", "cells": list(cells)})
+
+
+def _by_pos(game):
+    return {mon["pos"]: mon for mon in game._monsters.values()}
+
+
+def _grid_ids(game):
+    return sorted(mid for bucket in game._monster_grid.values() for mid in bucket)
+
+
+class TestMonsterTracking:
+    """Monsters are keyed by id while cell diffs arrive without one."""
+
+    def test_no_id_diff_at_cell_a_monster_left(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            game = _make_game(tmpdir, [])
+            _map(game, {"x": 10, "y": 10, "mon": {"id": 1, "name": "goblin"}})
+            _map(game, {"x": 10, "y": 10, "mon": None},
+                 {"x": 11, "y": 10, "mon": {"id": 1, "name": "goblin"}})
+            _map(game, {"x": 10, "y": 10, "mon": {"name": "rat"}})
+
+            mons = _by_pos(game)
+            assert mons[_pos_key(11, 10)]["name"] == "goblin"
+            assert mons[_pos_key(10, 10)]["name"] == "rat"
+            assert len(game._monsters) == 2
+            assert game._monster_pos[_pos_key(11, 10)] == 1
+
+    def test_moved_monster_is_not_dragged_back(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            game = _make_game(tmpdir, [])
+            _map(game, {"x": 10, "y": 10, "mon": {"id": 1, "name": "goblin"}})
+            # The old cell's clear arrives after the move
+            _map(game, {"x": 11, "y": 10, "mon": {"id": 1}})
+            _map(game, {"x": 10, "y": 10, "mon": {"name": "rat", "threat": 1}})
+            _map(game, {"x": 10, "y": 10, "mon": None})
+
+            assert game._monsters[1]["pos"] == _pos_key(11, 10)
+            assert "threat" not in game._monsters[1]
+            assert list(_by_pos(game)) == [_pos_key(11, 10)]
+            assert _grid_ids(game) == [1]
+
+    def test_monster_replaced_by_another_id(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            game = _make_game(tmpdir, [])
+            _map(game, {"x": 10, "y": 10, "mon": {"id": 1, "name": "goblin", "threat": 1}})
+            _map(game, {"x": 10, "y": 10, "mon": {"id": 2, "name": "orc"}})
+
+            assert list(game._monsters) == [2]
+            orc = game._monsters[2]
+            assert orc["name"] == "orc"
+            assert orc["threat"] == 1  # omitted as unchanged in the diff
+            assert orc["pos"] == _pos_key(10, 10)
+            assert _grid_ids(game) == [2]
+
+    def test_mon_field_cleared(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            game = _make_game(tmpdir, [])
+            _map(game, {"x": 10, "y": 10, "mon": {"id": 1, "name": "goblin"}})
+            _map(game, {"x": 10, "y": 10, "mon": None})
+
+            assert not game._monsters
+            assert not game._monster_pos
+            assert not game._monster_grid.get(_grid_key(_pos_key(10, 10)))
@@ -0,0 +1,111 @@
+"""Tests for menu/popup handling against a scripted WebSocket."""
+
+import json
+import os
+import tempfile
+import time
+from collections import deque
+
+from dcss_ai.game import DCSSGame
+from dcss_ai.webtiles import WebTilesConnection
+
+
+class FakeSocket:
+    """Stands in for the websockets client: frames arrive at fixed delays."""
+
+    def __init__(self, frames):
+        start = time.time()
+        self._frames = deque((start + delay, json.dumps({"msgs": msgs}))
+                             for delay, msgs in frames)
+
+    def send(self, data):
+        pass
+
+    def recv(self, timeout=None):
+        if self._frames:
+            ready_at, raw = self._frames[0]
+            wait = ready_at - time.time()
+            if wait <= (timeout or 0):
+                time.sleep(max(0, wait))
+                return self._frames.popleft()[1]
+        time.sleep(timeout or 0)
+        raise TimeoutError
+
+
+def _make_game(tmpdir, frames):
+    conn = WebTilesConnection.__new__(WebTilesConnection)
+    conn._ws = FakeSocket(frames)
+    conn._queue = deque()
+    game = DCSSGame(stats_path=os.path.join(tmpdir, "stats.json"))
+    game._ws = conn
+    game._connected = True
+    game._in_game = True
+    return game
+
+
+class TestMenuResponses:
+    """Messages trailing a menu/popup response are processed, not left queued."""
+
+    def test_select_menu_item_picks_up_trailing_player(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            game = _make_game(tmpdir, [
+                (0.0, [{"msg": "close_menu"}]),
+                (0.02, [{"msg": "player", "hp": 7, "hp_max": 20}]),
+            ])
+            game._current_menu = {"tag": "inventory"}
+
+            assert game.select_menu_item("a") == "Menu closed after pressing 'a'."
+            assert game.hp == 7
+            assert game.max_hp == 20
+            assert not game._ws._queue
+
+    def test_dismiss_popup_picks_up_trailing_player(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            game = _make_game(tmpdir, [
+                (0.0, [{"msg": "ui-pop"}]),
+                (0.02, [{"msg": "player", "hp": 12}]),
+            ])
+            game._current_popup = {"msg": "ui-push", "type": "describe-item"}
+
+            game.dismiss_popup()
+            assert game.hp == 12
+
+    def test_select_menu_item_without_menu_response(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            game = _make_game(tmpdir, [
+                (0.0, [{"msg": "msgs", "messages": [{"text": "You can't do that."}]}]),
+            ])
+            game._current_menu = {"tag": "inventory"}
+
+            start = time.time()
+            result = game.select_menu_item("z")
+            assert time.time() - start < 0.5
+            assert result.startswith("Pressed 'z'. Menu still open.")
+            assert "You can't do that." in game._messages
+
+
+class TestMenuText:
+    """Rendered menu/popup text is memoized without touching server dicts."""
+
+    def test_read_menu_leaves_message_dicts_untouched(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            game = _make_game(tmpdir, [])
+            item = {"text": "<white>a dagger</white>", "level": 2, "hotkeys": [97]}
+            menu = {"msg": "menu", "tag": "inventory",
+                    "title": {"text": "<yellow>Inventory</yellow>"}, "items": [item]}
+            game._handle_menu_msg(menu)
+
+            assert game.read_menu() == "=== Inventory (type: inventory) ===\n  [a] a dagger"
+            assert game.read_menu() == "=== Inventory (type: inventory) ===\n  [a] a dagger"
+            assert set(menu) == {"msg", "tag", "title", "items"}
+            assert set(item) == {"text", "level", "hotkeys"}
+
+            game._handle_menu_msg({"msg": "update_menu", "title": {"text": "Drop"}})
+            assert game.read_menu().startswith("=== Drop (type: inventory) ===")
+
+    def test_read_popup_data_keys(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            game = _make_game(tmpdir, [])
+            game._handle_ui_msg({"msg": "ui-push", "type": "newgame-choice",
+                                 "main-items": []})
+            assert game.read_popup().endswith("Data keys: main-items")